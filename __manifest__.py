@@ -2,7 +2,7 @@
 
 {
     'name': 'Management System Standards',
-    'version': '18.0.1.0.5',
+    'version': '18.0.1.0.7',
     'license': 'AGPL-3',
     'category': 'RB5820',
     'summary': 'Standards Management for Management Systems',
@@ -15,6 +15,9 @@
         'document_page',
         'product',
     ],
+    'external_dependencies': {
+        'python': ['openpyxl'],
+    },
     'data': [
         'security/security_groups.xml',
         'security/ir.model.access.csv',
@@ -30,9 +33,19 @@
         'views/mgmtsystem_standard_control_views.xml',
         'views/mgmtsystem_standard_certification_views.xml',
         'views/mgmtsystem_standard_assessment_tool_views.xml',
+        'views/mgmtsystem_standard_control_check_result_views.xml',
+        'views/mgmtsystem_standard_report_job_views.xml',
+        'views/mgmtsystem_compliance_snapshot_views.xml',
+        # Wizards
+        'wizard/mgmtsystem_standard_catalog_import_wizard_views.xml',
+        'wizard/mgmtsystem_standard_certification_import_wizard_views.xml',
         # Data
         'data/mgmtsystem_standard_data.xml',
         'data/mgmtsystem_iec62443_2023_data.xml',
+        'data/mgmtsystem_notification_cron.xml',
+        'data/mgmtsystem_control_testing_data.xml',
+        'data/mgmtsystem_report_job_data.xml',
+        'data/mgmtsystem_compliance_snapshot_data.xml',
 
 
 
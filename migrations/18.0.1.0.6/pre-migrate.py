@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Backfill the per-control cost columns that became stored in 18.0.1.0.6
+
+The columns are created and filled here with a single set-based UPDATE.
+The ORM then finds them already present and does not recompute every
+control through Python during the module update. The formulas mirror the
+compute methods of ``mgmtsystem.standard.control``.
+"""
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+COST_COLUMNS = [
+    'maintenance_cost',
+    'maintenance_cost_combined',
+    'total_annual_maintenance_time',
+    'total_annual_maintenance_time_combined',
+    'total_annual_maintenance_hours',
+    'total_annual_maintenance_hours_combined',
+    'cost_per_minute',
+    'total_first_year_cost',
+]
+
+
+def migrate(cr, version):
+    if not version:
+        return
+
+    for column in COST_COLUMNS:
+        cr.execute(
+            "ALTER TABLE mgmtsystem_standard_control ADD COLUMN IF NOT EXISTS %s double precision" % column
+        )
+
+    cr.execute("""
+        WITH base AS (
+            SELECT id,
+                   CASE test_frequency
+                       WHEN 'monthly' THEN 12
+                       WHEN 'quarterly' THEN 4
+                       WHEN 'semi_annual' THEN 2
+                       ELSE 1
+                   END AS multiplier,
+                   test_frequency IS NOT NULL AS has_frequency,
+                   COALESCE(maintenance_time, 0) AS manual_minutes,
+                   CASE WHEN automated_assessment AND COALESCE(automated_test_timing, 0) != 0
+                        THEN automated_test_timing / 60.0
+                        ELSE COALESCE(maintenance_time, 0)
+                   END AS combined_minutes,
+                   COALESCE(hourly_rate, 0) AS rate,
+                   COALESCE(implementation_cost, 0) AS implementation_cost,
+                   COALESCE(implementation_time, 0) AS implementation_time
+              FROM mgmtsystem_standard_control
+        ), annual AS (
+            SELECT id, implementation_cost, implementation_time,
+                   CASE WHEN manual_minutes != 0 AND has_frequency
+                        THEN manual_minutes * multiplier ELSE 0
+                   END AS manual_time,
+                   CASE WHEN has_frequency
+                        THEN combined_minutes * multiplier ELSE 0
+                   END AS combined_time,
+                   CASE WHEN manual_minutes != 0 AND has_frequency AND rate != 0
+                        THEN manual_minutes * multiplier / 60.0 * rate ELSE 0
+                   END AS manual_cost,
+                   CASE WHEN has_frequency AND rate != 0
+                        THEN combined_minutes * multiplier / 60.0 * rate ELSE 0
+                   END AS combined_cost
+              FROM base
+        )
+        UPDATE mgmtsystem_standard_control control
+           SET total_annual_maintenance_time = annual.manual_time,
+               total_annual_maintenance_hours = annual.manual_time / 60.0,
+               total_annual_maintenance_time_combined = annual.combined_time,
+               total_annual_maintenance_hours_combined = annual.combined_time / 60.0,
+               maintenance_cost = annual.manual_cost,
+               maintenance_cost_combined = annual.combined_cost,
+               cost_per_minute = CASE WHEN annual.implementation_time != 0 AND annual.implementation_cost != 0
+                                      THEN annual.implementation_cost / annual.implementation_time
+                                      ELSE 0 END,
+               total_first_year_cost = annual.implementation_cost + annual.manual_cost
+          FROM annual
+         WHERE annual.id = control.id
+    """)
+    _logger.info("Backfilled stored cost fields on %s controls", cr.rowcount)
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""Post-migration to 18.0.1.0.7
+
+- Store the earliest due date as next_due_date. It used to hold the first
+  date set (deadline, then target, then review date). ``LEAST`` ignores
+  NULLs, like ``_compute_next_due_date``.
+- Drop the parent_path pattern index of the domains: the subtree rollups
+  match prefixes taken from the joined rows, which it cannot serve.
+"""
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    if not version:
+        return
+
+    for table in ('mgmtsystem_standard', 'mgmtsystem_standard_domain'):
+        cr.execute(f"""
+            UPDATE {table}
+               SET next_due_date = LEAST(deadline, target_date, review_date)
+             WHERE next_due_date IS DISTINCT FROM LEAST(deadline, target_date, review_date)
+        """)
+        _logger.info("Recomputed the next due date of %s rows of %s", cr.rowcount, table)
+
+    cr.execute("DROP INDEX IF EXISTS mgmtsystem_standard_domain_parent_path_pattern_index")
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""Fill the effectiveness_score column stored since 18.0.1.0.7 in SQL
+
+Same formula as ``_get_effectiveness_score``. The domain and standard
+averages are left to the ORM: there are few of them and each batch is
+aggregated in one query.
+"""
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    if not version:
+        return
+
+    cr.execute(
+        "ALTER TABLE mgmtsystem_standard_control ADD COLUMN IF NOT EXISTS effectiveness_score double precision"
+    )
+    cr.execute("""
+        UPDATE mgmtsystem_standard_control
+           SET effectiveness_score = CASE
+                   WHEN state NOT IN ('implemented', 'verified') OR state IS NULL THEN 0
+                   ELSE LEAST(100, 50 * CASE
+                       WHEN NOT COALESCE(automated_assessment, false) THEN 1
+                       WHEN automated_check_result = 'pass' THEN 1.2
+                       WHEN automated_check_result = 'warning' THEN 0.8
+                       WHEN automated_check_result = 'fail' THEN 0.6
+                       ELSE 1
+                   END)
+               END
+    """)
+    _logger.info("Backfilled the effectiveness score of %s controls", cr.rowcount)
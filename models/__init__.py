@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
+from . import mgmtsystem_external_id_mixin
+from . import mgmtsystem_due_date_mixin
+from . import mgmtsystem_company_propagation_mixin
 from . import mgmtsystem_standard
 from . import mgmtsystem_standard_category
 from . import mgmtsystem_standard_domain
@@ -9,3 +12,13 @@ from . import mgmtsystem_standard_audit_question
 from . import mgmtsystem_standard_control
 from . import mgmtsystem_standard_certification
 from . import mgmtsystem_standard_assessment_tool
+from . import mgmtsystem_standard_control_check_result
+from . import mgmtsystem_standard_assessment_runner
+from . import mgmtsystem_standard_catalog_importer
+from . import mgmtsystem_standard_certification_importer
+from . import mgmtsystem_standard_report_job
+from . import report_standard_control
+from . import mgmtsystem_compliance_snapshot
+from . import mgmtsystem_notification_config
+from . import mgmtsystem_notification_digest
+from . import res_users
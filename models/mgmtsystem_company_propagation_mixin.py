@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, api
+
+
+class MgmtSystemCompanyPropagationMixin(models.AbstractModel):
+    """Company Propagation Mixin
+
+    Keeps the company of a record among its allowed companies. The missing
+    links of a whole recordset are added with one set-based insert into the
+    ``allowed_company_ids`` relation table instead of one many2many write
+    per record.
+    """
+    _name = "mgmtsystem.company.propagation.mixin"
+    _description = "Management System Company Propagation Mixin"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Ensure company_id is always included in allowed_company_ids"""
+        records = super().create(vals_list)
+        records._propagate_company_to_allowed_companies()
+        return records
+
+    def write(self, vals):
+        """Ensure company_id is always included in allowed_company_ids when updated"""
+        result = super().write(vals)
+        if not self._get_company_propagation_trigger_fields().isdisjoint(vals):
+            self._propagate_company_to_allowed_companies()
+        return result
+
+    @api.model
+    def _get_company_propagation_trigger_fields(self):
+        """Fields whose update may leave the company out of the allowed companies"""
+        return {'company_id', 'allowed_company_ids'}
+
+    def _propagate_company_to_allowed_companies(self):
+        """Link each record's company to its allowed companies in one query"""
+        if not self:
+            return
+        self.flush_recordset(['company_id', 'allowed_company_ids'])
+        field = self._fields['allowed_company_ids']
+        self.env.cr.execute("""
+            INSERT INTO %(relation)s (%(column1)s, %(column2)s)
+            SELECT id, company_id
+              FROM %(table)s
+             WHERE id IN %%s AND company_id IS NOT NULL
+                ON CONFLICT DO NOTHING
+         RETURNING %(column1)s
+        """ % {
+            'relation': field.relation,
+            'column1': field.column1,
+            'column2': field.column2,
+            'table': self._table,
+        }, [tuple(self.ids)])
+        linked = self.browse(row[0] for row in self.env.cr.fetchall())
+        if linked:
+            linked.invalidate_recordset(['allowed_company_ids'])
+            linked.modified(['allowed_company_ids'])
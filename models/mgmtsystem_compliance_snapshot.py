@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import create_unique_index
+
+_logger = logging.getLogger(__name__)
+
+# Time buckets of the compliance history API -> date_trunc unit
+SNAPSHOT_GRANULARITIES = {'day': 'day', 'week': 'week', 'month': 'month'}
+# Snapshot figures averaged per bucket by the compliance history API
+SNAPSHOT_MEASURES = [
+    'control_count',
+    'implemented_control_count',
+    'compliance_score',
+    'average_effectiveness_score',
+    'maintenance_cost',
+    'implementation_cost',
+]
+
+
+class MgmtSystemComplianceSnapshot(models.Model):
+    """Daily Compliance Snapshot
+
+    Fact table holding, per day, the compliance, control counts and cost
+    rollups of every standard (rows without domain) and domain, with the
+    company they belong to. A daily cron copies the current stored rollups,
+    summing the standard costs from the controls, with one ``INSERT ...
+    SELECT``; taking a snapshot twice on the same day refreshes that day's
+    rows. The history is read straight from this table, through the unique
+    index on ``(standard_id, domain_id, snapshot_date)``.
+    """
+    _name = 'mgmtsystem.compliance.snapshot'
+    _description = 'Daily Compliance Snapshot'
+    _order = 'snapshot_date desc, standard_id, domain_id'
+    _log_access = False
+
+    snapshot_date = fields.Date(string='Date', required=True)
+    standard_id = fields.Many2one(
+        'mgmtsystem.standard',
+        string='Standard',
+        required=True,
+        ondelete='cascade',
+    )
+    domain_id = fields.Many2one(
+        'mgmtsystem.standard.domain',
+        string='Domain',
+        ondelete='cascade',
+        index='btree_not_null',
+        help="Empty on the rows of the standard as a whole"
+    )
+    company_id = fields.Many2one('res.company', string='Company', ondelete='cascade')
+    control_count = fields.Integer(string='Controls', aggregator='avg')
+    implemented_control_count = fields.Integer(string='Implemented Controls', aggregator='avg')
+    compliance_score = fields.Float(string='Compliance Score (%)', aggregator='avg')
+    average_effectiveness_score = fields.Float(string='Average Effectiveness', aggregator='avg')
+    maintenance_cost = fields.Float(string='Annual Maintenance Cost', aggregator='avg')
+    implementation_cost = fields.Float(string='Implementation Cost', aggregator='avg')
+
+    def init(self):
+        # One row per standard or domain and day; also serves the history queries
+        create_unique_index(
+            self.env.cr,
+            'mgmtsystem_compliance_snapshot_unique_index',
+            self._table,
+            ['standard_id', 'COALESCE(domain_id, 0)', 'snapshot_date'],
+        )
+
+    @api.model
+    def _take_snapshots(self, snapshot_date=None):
+        """Snapshot every active standard and domain in one statement
+
+        The standard costs are summed from the active controls grouped on
+        ``standard_id``, the same aggregate as the standard's
+        ``standard_total_*`` totals, so both always agree.
+        """
+        snapshot_date = snapshot_date or fields.Date.context_today(self)
+        self.env['mgmtsystem.standard'].flush_model([
+            'active', 'company_id', 'control_count', 'implemented_control_count',
+            'compliance_score', 'average_effectiveness_score',
+        ])
+        self.env['mgmtsystem.standard.domain'].flush_model([
+            'active', 'standard_id', 'company_id', 'control_count', 'implemented_control_count',
+            'compliance_score', 'domain_average_effectiveness_score',
+            'domain_total_maintenance_cost_combined', 'domain_total_implementation_cost',
+        ])
+        self.env['mgmtsystem.standard.control'].flush_model([
+            'active', 'standard_id', 'maintenance_cost_combined', 'implementation_cost',
+        ])
+        self.env.cr.execute("""
+            INSERT INTO mgmtsystem_compliance_snapshot
+                   (snapshot_date, standard_id, domain_id, company_id, control_count,
+                    implemented_control_count, compliance_score, average_effectiveness_score,
+                    maintenance_cost, implementation_cost)
+            SELECT %(date)s, s.id, NULL, s.company_id, s.control_count,
+                   s.implemented_control_count, s.compliance_score, s.average_effectiveness_score,
+                   COALESCE(costs.maintenance_cost, 0), COALESCE(costs.implementation_cost, 0)
+              FROM mgmtsystem_standard s
+         LEFT JOIN (SELECT c.standard_id,
+                           SUM(c.maintenance_cost_combined) AS maintenance_cost,
+                           SUM(c.implementation_cost) AS implementation_cost
+                      FROM mgmtsystem_standard_control c
+                      JOIN mgmtsystem_standard cs ON cs.id = c.standard_id AND cs.active
+                     WHERE c.active
+                  GROUP BY c.standard_id) costs ON costs.standard_id = s.id
+             WHERE s.active
+         UNION ALL
+            SELECT %(date)s, d.standard_id, d.id, d.company_id, d.control_count,
+                   d.implemented_control_count, d.compliance_score, d.domain_average_effectiveness_score,
+                   d.domain_total_maintenance_cost_combined, d.domain_total_implementation_cost
+              FROM mgmtsystem_standard_domain d
+              JOIN mgmtsystem_standard s ON s.id = d.standard_id AND s.active
+             WHERE d.active
+                ON CONFLICT (standard_id, COALESCE(domain_id, 0), snapshot_date) DO UPDATE
+               SET company_id = EXCLUDED.company_id,
+                   control_count = EXCLUDED.control_count,
+                   implemented_control_count = EXCLUDED.implemented_control_count,
+                   compliance_score = EXCLUDED.compliance_score,
+                   average_effectiveness_score = EXCLUDED.average_effectiveness_score,
+                   maintenance_cost = EXCLUDED.maintenance_cost,
+                   implementation_cost = EXCLUDED.implementation_cost
+        """, {'date': snapshot_date})
+        count = self.env.cr.rowcount
+        self.invalidate_model()
+        return count
+
+    @api.model
+    def _cron_take_snapshots(self):
+        count = self._take_snapshots()
+        _logger.info("Stored %d compliance snapshots", count)
+
+    @api.model
+    def get_compliance_history(self, standard_ids=None, domain_ids=None, date_from=None, date_to=None,
+                               granularity='day'):
+        """Compliance over time of standards or domains
+
+        Without ``domain_ids``, returns the history of the standards (all
+        readable ones when ``standard_ids`` is not given); otherwise the
+        history of the given domains. Each figure is averaged over the
+        ``day``, ``week`` or ``month`` buckets of the snapshot dates.
+
+        :return: list of dicts with ``standard_id``, ``domain_id``,
+                 ``company_id``, ``date`` (start of the bucket) and the
+                 averaged ``SNAPSHOT_MEASURES``, ordered by record and date
+        """
+        if granularity not in SNAPSHOT_GRANULARITIES:
+            raise UserError(_('Unknown granularity: %s', granularity))
+        self.check_access('read')
+        if domain_ids is not None:
+            domains = self.env['mgmtsystem.standard.domain'].with_context(active_test=False)
+            ids = domains.search([('id', 'in', list(domain_ids))]).ids
+            where = ["domain_id = ANY(%(ids)s)"]
+        else:
+            standards = self.env['mgmtsystem.standard'].with_context(active_test=False)
+            ids = standards.search([('id', 'in', list(standard_ids))] if standard_ids is not None else []).ids
+            where = ["standard_id = ANY(%(ids)s)", "domain_id IS NULL"]
+        if date_from:
+            where.append("snapshot_date >= %(date_from)s")
+        if date_to:
+            where.append("snapshot_date <= %(date_to)s")
+        self.env.cr.execute("""
+            SELECT standard_id, domain_id, company_id,
+                   date_trunc('%(unit)s', snapshot_date)::date AS date, %(measures)s
+              FROM mgmtsystem_compliance_snapshot
+             WHERE %(where)s
+          GROUP BY standard_id, domain_id, company_id, 4
+          ORDER BY standard_id, domain_id NULLS FIRST, 4
+        """ % {
+            'unit': SNAPSHOT_GRANULARITIES[granularity],
+            'measures': ', '.join(f'AVG({measure}) AS {measure}' for measure in SNAPSHOT_MEASURES),
+            'where': ' AND '.join(where),
+        }, {
+            'ids': ids,
+            'date_from': fields.Date.to_date(date_from),
+            'date_to': fields.Date.to_date(date_to),
+        })
+        return self.env.cr.dictfetchall()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+
+from odoo import models, fields, api
+
+
+class MgmtSystemDueDateMixin(models.AbstractModel):
+    """Due Date Mixin
+
+    Deadline, target and review dates of standards and domains. The
+    earliest one set is stored as ``next_due_date`` so the overdue and due
+    today notifications are plain range scans on a single indexed column.
+    Changes to these items mark the precomputed login notification digests
+    stale.
+    """
+    _name = "mgmtsystem.due.date.mixin"
+    _description = "Management System Due Date Mixin"
+
+    deadline = fields.Date(
+        string="Deadline",
+        tracking=True,
+        help="Hard deadline for this item"
+    )
+    target_date = fields.Date(
+        string="Target Date",
+        tracking=True,
+        help="Planned completion date"
+    )
+    review_date = fields.Date(
+        string="Review Date",
+        tracking=True,
+        help="Date of the next scheduled review"
+    )
+    next_due_date = fields.Date(
+        string="Next Due Date",
+        compute="_compute_next_due_date",
+        store=True,
+        index='btree_not_null',
+        help="Earliest of the deadline, target date and review date"
+    )
+
+    @api.depends('deadline', 'target_date', 'review_date')
+    def _compute_next_due_date(self):
+        for record in self:
+            dates = [date for date in (record.deadline, record.target_date, record.review_date) if date]
+            record.next_due_date = min(dates) if dates else False
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['mgmtsystem.notification.digest']._mark_stale(records._get_digest_users())
+        return records
+
+    def write(self, vals):
+        if self._get_digest_trigger_fields().isdisjoint(vals):
+            return super().write(vals)
+        # The items may move out of some users' scope, and into others'
+        users = self._get_digest_users()
+        res = super().write(vals)
+        self.env['mgmtsystem.notification.digest']._mark_stale(users | self._get_digest_users())
+        return res
+
+    def unlink(self):
+        self.env['mgmtsystem.notification.digest']._mark_stale(self._get_digest_users())
+        return super().unlink()
+
+    def _get_digest_users(self):
+        """Users whose login digest may list one of these items
+
+        Only the items due by tomorrow (server date, which covers the
+        users' timezones) show in a digest, and only to the users whose
+        companies are in their scope.
+        """
+        horizon = fields.Date.today() + timedelta(days=1)
+        records = self.filtered(lambda record: record.next_due_date and record.next_due_date <= horizon)
+        if not records:
+            return self.env['res.users']
+        domain = [('share', '=', False), ('enable_login_notifications', '=', True)]
+        if all(record.company_id for record in records):
+            domain.append(('company_ids', 'in', (records.company_id | records.allowed_company_ids).ids))
+        return self.env['res.users'].sudo().with_context(active_test=False).search(domain)
+
+    @api.model
+    def _get_digest_trigger_fields(self):
+        """Fields shown in or scoping the login notification digests"""
+        return {
+            'name', 'active', 'deadline', 'target_date', 'review_date',
+            'company_id', 'allowed_company_ids',
+        }
+
+    @api.model
+    def _get_user_scope_domain(self, user):
+        """Domain of the items ``user`` gets notified about"""
+        return [
+            '|', '|',
+            ('company_id', '=', False),
+            ('company_id', 'in', user.company_ids.ids),
+            ('allowed_company_ids', 'in', user.company_ids.ids),
+        ]
+
+    @api.model
+    def _get_overdue_domain(self, today):
+        return [('next_due_date', '<', today)]
+
+    @api.model
+    def _get_due_today_domain(self, today):
+        return [('next_due_date', '=', today)]
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+
+
+class MgmtSystemExternalIdMixin(models.AbstractModel):
+    """External ID Mixin
+
+    Exposes the XML ID of standards, domains and controls. The XML IDs of a
+    whole recordset are resolved with one query on ir.model.data, and the
+    reverse lookup lets import scripts resolve many references at once.
+    """
+    _name = "mgmtsystem.external.id.mixin"
+    _description = "Management System External ID Mixin"
+
+    external_id = fields.Char(
+        string="External ID",
+        compute="_compute_external_id",
+        help="External identifier from data import (XML ID)"
+    )
+
+    def _compute_external_id(self):
+        """Compute the external ID (XML ID) for this record"""
+        external_ids = self._get_external_ids()
+        for record in self:
+            record.external_id = external_ids.get(record._origin.id, False)
+
+    def _get_external_ids(self):
+        """Resolve the XML IDs of the recordset in a single query
+
+        :return: dict mapping record ids to ``'module.name'``, or False for
+                 records without XML ID
+        """
+        res_ids = self._origin.ids
+        external_ids = dict.fromkeys(res_ids, False)
+        if res_ids:
+            data = self.env['ir.model.data'].sudo().search_read(
+                [('model', '=', self._name), ('res_id', 'in', res_ids)],
+                ['res_id', 'module', 'name'],
+                order='module desc, name desc',
+            )
+            # Reverse order so the first XML ID in ir.model.data order wins
+            for row in data:
+                external_ids[row['res_id']] = f"{row['module']}.{row['name']}"
+        return external_ids
+
+    @api.model
+    def _resolve_external_ids(self, xmlids):
+        """Reverse lookup of XML IDs of this model in a single query
+
+        Unknown XML IDs are left out of the result.
+
+        :param xmlids: iterable of ``'module.name'`` strings
+        :return: dict mapping each resolved XML ID to its record
+        """
+        pairs = {tuple(xmlid.split('.', 1)) for xmlid in xmlids if '.' in xmlid}
+        if not pairs:
+            return {}
+        data = self.env['ir.model.data'].sudo().search_read([
+            ('model', '=', self._name),
+            ('module', 'in', list({module for module, name in pairs})),
+            ('name', 'in', list({name for module, name in pairs})),
+        ], ['res_id', 'module', 'name'])
+        result = {}
+        for row in data:
+            if (row['module'], row['name']) not in pairs:
+                continue
+            xmlid = f"{row['module']}.{row['name']}"
+            result[xmlid] = self.browse(row['res_id'])
+        return result
@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 
 from odoo import models, fields, api
-from datetime import datetime, date
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -13,6 +12,9 @@ class MgmtSystemNotificationConfig(models.Model):
     
     name = fields.Char('Name', required=True, default='Default Notification Config')
     active = fields.Boolean('Active', default=True)
+    trigger_type = fields.Selection([
+        ('login', 'On Login'),
+    ], string='Trigger', default='login', required=True)
     
     # Login notification settings
     enable_login_notifications = fields.Boolean('Enable Login Notifications', default=True)
@@ -32,77 +34,67 @@ class MgmtSystemNotificationConfig(models.Model):
     max_overdue_items = fields.Integer('Max Overdue Items to Show', default=5)
     max_due_today_items = fields.Integer('Max Due Today Items to Show', default=5)
     
-    def _get_overdue_items(self):
-        """Get overdue standards and domains"""
-        today = date.today()
-        
-        overdue_data = {
-            'standards': self.env['mgmtsystem.standard'],
-            'domains': self.env['mgmtsystem.standard.domain'],
-            'count': 0
-        }
-        
-        if self.include_overdue_standards:
-            # Find overdue standards
-            overdue_standards = self.env['mgmtsystem.standard'].search([
-                '|', '|',
-                ('deadline', '<', today),
-                ('target_date', '<', today),
-                ('review_date', '<', today),
-                ('active', '=', True)
-            ])
-            overdue_data['standards'] = overdue_standards[:self.max_overdue_items]
-            overdue_data['count'] += len(overdue_standards)
-        
-        if self.include_overdue_domains:
-            # Find overdue domains
-            overdue_domains = self.env['mgmtsystem.standard.domain'].search([
-                '|', '|',
-                ('deadline', '<', today),
-                ('target_date', '<', today),
-                ('review_date', '<', today),
-                ('active', '=', True)
-            ])
-            overdue_data['domains'] = overdue_domains[:self.max_overdue_items]
-            overdue_data['count'] += len(overdue_domains)
-        
-        return overdue_data
-    
-    def _get_due_today_items(self):
-        """Get standards and domains due today"""
-        today = date.today()
-        
-        due_today_data = {
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['mgmtsystem.notification.digest']._mark_stale()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env['mgmtsystem.notification.digest']._mark_stale()
+        return res
+
+    def _get_overdue_items(self, user=None, today=None):
+        """Get overdue standards and domains, optionally scoped to ``user``"""
+        today = today or fields.Date.context_today(self)
+        return self._get_due_items(
+            self.include_overdue_standards,
+            self.include_overdue_domains,
+            lambda model: model._get_overdue_domain(today),
+            self.max_overdue_items,
+            user,
+        )
+
+    def _get_due_today_items(self, user=None, today=None):
+        """Get standards and domains due today, optionally scoped to ``user``"""
+        today = today or fields.Date.context_today(self)
+        return self._get_due_items(
+            self.include_due_today_standards,
+            self.include_due_today_domains,
+            lambda model: model._get_due_today_domain(today),
+            self.max_due_today_items,
+            user,
+        )
+
+    def _get_due_items(self, include_standards, include_domains, get_domain, limit, user=None):
+        """Count and fetch the first due standards and domains
+
+        Both lookups are range scans on the indexed ``next_due_date``: the
+        total comes from ``search_count`` and only ``limit`` records per
+        model are loaded, oldest due date first. When ``user`` is given the
+        lookups run as that user, within the companies of the user, so the
+        record rules apply, and are restricted to the items in their scope.
+        """
+        self.ensure_one()
+        due_data = {
             'standards': self.env['mgmtsystem.standard'],
             'domains': self.env['mgmtsystem.standard.domain'],
             'count': 0
         }
-        
-        if self.include_due_today_standards:
-            # Find standards due today
-            due_today_standards = self.env['mgmtsystem.standard'].search([
-                '|', '|',
-                ('deadline', '=', today),
-                ('target_date', '=', today),
-                ('review_date', '=', today),
-                ('active', '=', True)
-            ])
-            due_today_data['standards'] = due_today_standards[:self.max_due_today_items]
-            due_today_data['count'] += len(due_today_standards)
-        
-        if self.include_due_today_domains:
-            # Find domains due today
-            due_today_domains = self.env['mgmtsystem.standard.domain'].search([
-                '|', '|',
-                ('deadline', '=', today),
-                ('target_date', '=', today),
-                ('review_date', '=', today),
-                ('active', '=', True)
-            ])
-            due_today_data['domains'] = due_today_domains[:self.max_due_today_items]
-            due_today_data['count'] += len(due_today_domains)
-        
-        return due_today_data
+        for key, include in (('standards', include_standards), ('domains', include_domains)):
+            if not include:
+                continue
+            Model = due_data[key]
+            domain = get_domain(Model)
+            if user:
+                Model = Model.with_user(user).with_context(allowed_company_ids=user.company_ids.ids)
+                if not Model.has_access('read'):
+                    continue
+                domain += Model._get_user_scope_domain(user)
+            due_data['count'] += Model.search_count(domain)
+            due_data[key] = Model.search(domain, order='next_due_date, id', limit=limit)
+        return due_data
     
     @api.model
     def get_default_config(self):
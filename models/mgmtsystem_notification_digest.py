@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+# The popup shows at most this many items per list
+POPUP_MAX_ITEMS = 8
+# Digests rebuilt per cron run before the cron re-triggers itself
+DIGEST_CRON_BATCH_SIZE = 200
+
+
+class MgmtSystemNotificationDigest(models.Model):
+    """Login Notification Digest
+
+    One row per user holding the overdue and due today items of the login
+    popup, precomputed by a cron so the popup check is a single indexed
+    read, and the time the popup was last shown. Changes to the underlying
+    due dates mark the digests stale; stale or outdated digests are rebuilt
+    by the next cron run, or on the user's next popup check if the cron has
+    not caught up yet.
+    """
+    _name = 'mgmtsystem.notification.digest'
+    _description = 'Management System Login Notification Digest'
+    _log_access = False
+
+    user_id = fields.Many2one(
+        'res.users',
+        string='User',
+        required=True,
+        ondelete='cascade',
+    )
+    digest_date = fields.Date(
+        string='Digest Date',
+        help="Day the digest was computed for, in the user's timezone"
+    )
+    stale = fields.Boolean(
+        string='Stale',
+        default=True,
+        help="Set when due dates changed since the digest was computed"
+    )
+    last_notified = fields.Datetime(
+        string='Last Notified',
+        help="Last time the login popup was shown to the user"
+    )
+    overdue_items = fields.Json(string='Overdue Items')
+    due_today_items = fields.Json(string='Due Today Items')
+
+    _sql_constraints = [
+        ('user_uniq', 'unique(user_id)', 'Only one notification digest per user is allowed.'),
+    ]
+
+    @api.model
+    def _mark_stale(self, users=None):
+        """Flag the digests of ``users`` (default: all) for recomputation"""
+        if users is not None and not users:
+            return
+        query = "UPDATE mgmtsystem_notification_digest SET stale = true WHERE NOT stale"
+        params = []
+        if users is not None:
+            query += " AND user_id IN %s"
+            params.append(tuple(users.ids) or (None,))
+        self.env.cr.execute(query, params)
+        self.invalidate_model(['stale'])
+
+    @api.model
+    def _set_last_notified(self, user, last_notified):
+        """Record when the popup was last shown to ``user``
+
+        Upserted on this table so concurrent logins never lock or write
+        ``res_users``.
+        """
+        self.env.cr.execute("""
+            INSERT INTO mgmtsystem_notification_digest (user_id, last_notified, stale)
+            VALUES (%s, %s, true)
+                ON CONFLICT (user_id) DO UPDATE
+               SET last_notified = EXCLUDED.last_notified
+        """, [user.id, last_notified or None])
+        self.invalidate_model(['last_notified'])
+
+    @api.model
+    def _get_user_today(self, user):
+        return fields.Date.context_today(self.with_context(tz=user.tz))
+
+    def _is_current(self, user):
+        return bool(self) and not self.stale and self.digest_date == self._get_user_today(user)
+
+    @api.model
+    def _get_user_digest(self, user):
+        """Digest of ``user``, rebuilt first when missing, stale or outdated"""
+        digest = self.search([('user_id', '=', user.id)], limit=1)
+        if not digest._is_current(user):
+            self._refresh_digests(user)
+            digest = self.search([('user_id', '=', user.id)], limit=1)
+        return digest
+
+    @api.model
+    def _refresh_digests(self, users):
+        """Recompute and upsert the digests of ``users``"""
+        if not users:
+            return
+        Config = self.env['mgmtsystem.notification.config']
+        config = Config.search([('trigger_type', '=', 'login')], limit=1) or Config.new({})
+        rows = []
+        for user in users:
+            today = self._get_user_today(user)
+            overdue_items = self._format_items(config._get_overdue_items(user, today), today)
+            due_today_items = self._format_items(
+                config._get_due_today_items(user, today), today, is_due_today=True
+            )
+            rows.append((user.id, today, json.dumps(overdue_items), json.dumps(due_today_items)))
+        user_ids, dates, overdue, due_today = (list(column) for column in zip(*rows))
+        self.env.cr.execute("""
+            INSERT INTO mgmtsystem_notification_digest
+                   (user_id, digest_date, overdue_items, due_today_items, stale)
+            SELECT user_id, digest_date, overdue_items, due_today_items, false
+              FROM unnest(%s::int[], %s::date[], %s::jsonb[], %s::jsonb[])
+                AS t(user_id, digest_date, overdue_items, due_today_items)
+                ON CONFLICT (user_id) DO UPDATE
+               SET digest_date = EXCLUDED.digest_date,
+                   overdue_items = EXCLUDED.overdue_items,
+                   due_today_items = EXCLUDED.due_today_items,
+                   stale = false
+        """, [user_ids, dates, overdue, due_today])
+        self.invalidate_model()
+
+    @api.model
+    def _format_items(self, items_data, today, is_due_today=False):
+        """Format items from notification config format for popup display"""
+        formatted_items = []
+        for key, item_type in (('standards', 'Standard'), ('domains', 'Domain')):
+            for record in items_data.get(key, []):
+                item = {
+                    'name': record.name,
+                    'type': item_type,
+                    'url': f'/web#id={record.id}&model={record._name}'
+                }
+                if not is_due_today:
+                    deadline = record.next_due_date
+                    item['days_overdue'] = (today - deadline).days if deadline else 0
+                    item['deadline'] = deadline.strftime('%Y-%m-%d') if deadline else 'No deadline'
+                formatted_items.append(item)
+        return formatted_items[:POPUP_MAX_ITEMS]
+
+    @api.model
+    def _cron_refresh_digests(self):
+        """Rebuild the missing, stale and outdated digests of internal users"""
+        users = self.env['res.users'].search([
+            ('share', '=', False),
+            ('enable_login_notifications', '=', True),
+        ])
+        digests = {
+            digest.user_id.id: digest
+            for digest in self.search([('user_id', 'in', users.ids)])
+        }
+        outdated_users = users.filtered(
+            lambda user: not digests.get(user.id, self)._is_current(user)
+        )
+        batch = outdated_users[:DIGEST_CRON_BATCH_SIZE]
+        self._refresh_digests(batch)
+        _logger.info("Refreshed %d login notification digests", len(batch))
+        self.env['ir.cron']._notify_progress(
+            done=len(batch),
+            remaining=len(outdated_users) - len(batch),
+        )
@@ -3,6 +3,8 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
 
+from .mgmtsystem_standard_control import COST_ROLLUP_FIELDS
+
 
 class MgmtSystemStandard(models.Model):
 
@@ -13,7 +15,7 @@ class MgmtSystemStandard(models.Model):
     """
     _name = "mgmtsystem.standard"
     _description = "Management System Standard"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'mgmtsystem.external.id.mixin', 'mgmtsystem.due.date.mixin', 'mgmtsystem.company.propagation.mixin']
     _check_company_auto = True
     _parent_name = 'parent_id'                  # by default its name is parent_id you can change it
     _parent_store = True                        # tell odoo that this model support parent & child relation ship
@@ -243,25 +245,6 @@ class MgmtSystemStandard(models.Model):
         help="Companies that can access this standard"
     )
 
-    @api.model_create_multi
-    def create(self, vals_list):
-        """Ensure company_id is always included in allowed_company_ids"""
-        records = super().create(vals_list)
-        for record in records:
-            if record.company_id and record.company_id not in record.allowed_company_ids:
-                record.allowed_company_ids = [(4, record.company_id.id)]
-        return records
-
-    def write(self, vals):
-        """Ensure company_id is always included in allowed_company_ids when updated"""
-        result = super().write(vals)
-        # Check if either company_id or allowed_company_ids was modified
-        if 'company_id' in vals or 'allowed_company_ids' in vals:
-            for record in self:
-                if record.company_id and record.company_id not in record.allowed_company_ids:
-                    record.allowed_company_ids = [(4, record.company_id.id)]
-        return result
-
     # Standard Cost Information
     standard_total_maintenance_cost_manual = fields.Float(
         string='Total Maintenance Cost (Manual Only)',
@@ -334,6 +317,19 @@ class MgmtSystemStandard(models.Model):
         help="Overall compliance score for this standard"
     )
 
+    control_ids = fields.One2many(
+        'mgmtsystem.standard.control',
+        'standard_id',
+        string='Controls',
+    )
+    average_effectiveness_score = fields.Float(
+        string="Average Effectiveness",
+        compute="_compute_average_effectiveness_score",
+        store=True,
+        aggregator='avg',
+        help="Average effectiveness score of the active controls of this standard"
+    )
+
     last_assessment_date = fields.Date(
         string="Last Assessment",
         tracking=True
@@ -357,11 +353,6 @@ class MgmtSystemStandard(models.Model):
         help="If unchecked, it will allow you to hide this standard without removing it."
     )
     
-    external_id = fields.Char(
-        string="External ID",
-        compute="_compute_external_id",
-        help="External identifier from data import (XML ID)"
-    )
     
     # Control Implementation Status
     state = fields.Selection([
@@ -413,29 +404,41 @@ class MgmtSystemStandard(models.Model):
                 lambda c: c.implemented
             ))
     
-    @api.depends('domain_ids', 'domain_ids.control_ids', 'domain_ids.control_ids.maintenance_cost', 
-                 'domain_ids.control_ids.maintenance_cost_combined', 'domain_ids.control_ids.implementation_cost',
-                 'domain_ids.control_ids.total_annual_maintenance_time', 'domain_ids.control_ids.total_annual_maintenance_time_combined',
-                 'domain_ids.control_ids.total_annual_maintenance_hours', 'domain_ids.control_ids.total_annual_maintenance_hours_combined')
+    @api.depends('control_ids.active', *('control_ids.%s' % fname for fname in COST_ROLLUP_FIELDS))
     def _compute_standard_costs(self):
-        """Compute cost and time statistics for all controls in this standard"""
+        """Compute cost and time statistics for all controls in this standard
+
+        The totals of every standard in the recordset are aggregated in one
+        grouped query rather than per standard and per control.
+        """
+        rollups = self.env['mgmtsystem.standard.control']._read_cost_rollup(
+            [('standard_id', 'in', self.ids)], 'standard_id'
+        )
         for record in self:
-            # Get all controls linked to this standard through domains
-            all_controls = self.env['mgmtsystem.standard.control'].search([
-                ('standard_id', '=', record.id)
-            ])
-            
-            record.standard_control_count = len(all_controls)
-            record.standard_total_maintenance_cost_manual = sum(all_controls.mapped('maintenance_cost'))
-            record.standard_total_maintenance_cost_combined = sum(all_controls.mapped('maintenance_cost_combined'))
-            record.standard_total_implementation_cost = sum(all_controls.mapped('implementation_cost'))
-            
+            rollup = rollups.get(record._origin.id, {})
+            record.standard_control_count = rollup.get('control_count', 0)
+            record.standard_total_maintenance_cost_manual = rollup.get('maintenance_cost', 0.0)
+            record.standard_total_maintenance_cost_combined = rollup.get('maintenance_cost_combined', 0.0)
+            record.standard_total_implementation_cost = rollup.get('implementation_cost', 0.0)
+
             # Time calculations
-            record.standard_total_maintenance_time_manual = sum(all_controls.mapped('total_annual_maintenance_time'))
-            record.standard_total_maintenance_time_combined = sum(all_controls.mapped('total_annual_maintenance_time_combined'))
-            record.standard_total_maintenance_hours_manual = sum(all_controls.mapped('total_annual_maintenance_hours'))
-            record.standard_total_maintenance_hours_combined = sum(all_controls.mapped('total_annual_maintenance_hours_combined'))
+            record.standard_total_maintenance_time_manual = rollup.get('total_annual_maintenance_time', 0.0)
+            record.standard_total_maintenance_time_combined = rollup.get('total_annual_maintenance_time_combined', 0.0)
+            record.standard_total_maintenance_hours_manual = rollup.get('total_annual_maintenance_hours', 0.0)
+            record.standard_total_maintenance_hours_combined = rollup.get('total_annual_maintenance_hours_combined', 0.0)
     
+    @api.depends('control_ids.active', 'control_ids.effectiveness_score')
+    def _compute_average_effectiveness_score(self):
+        """Average the stored control scores of the batch in one grouped query
+
+        Only the standards of the controls that changed are recomputed.
+        """
+        averages = dict(self.env['mgmtsystem.standard.control']._read_group(
+            [('standard_id', 'in', self._origin.ids)], ['standard_id'], ['effectiveness_score:avg'],
+        ))
+        for record in self:
+            record.average_effectiveness_score = averages.get(record._origin, 0.0) or 0.0
+
     @api.depends('name', 'version')
     def _compute_code(self):
         for record in self:
@@ -444,6 +447,11 @@ class MgmtSystemStandard(models.Model):
             else:
                 record.code = record.name or ''
     
+    def action_export_control_report(self):
+        """Export the control report of the whole standard in the background"""
+        controls = self.env['mgmtsystem.standard.control'].search([('standard_id', 'in', self.ids)])
+        return controls.action_export_report()
+
     def action_rebuild_parent_store(self):
         """Rebuild the nested set hierarchy for all domains."""
         domain_model = self.env['mgmtsystem.standard.domain']
@@ -500,17 +508,6 @@ class MgmtSystemStandard(models.Model):
                 }
             }
     
-    def _compute_external_id(self):
-        """Compute the external ID (XML ID) for this record"""
-        for record in self:
-            data = self.env['ir.model.data'].search([
-                ('model', '=', record._name),
-                ('res_id', '=', record.id)
-            ], limit=1)
-            if data:
-                record.external_id = f"{data.module}.{data.name}"
-            else:
-                record.external_id = False
     
     # Add a SQL constraint to ensure uniqueness per company
     _sql_constraints = [
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import shlex
+import subprocess
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import timedelta
+from itertools import islice
+
+from odoo import models, fields, api
+
+from .mgmtsystem_standard_control_check_result import CHECK_RESULT_CODES
+
+_logger = logging.getLogger(__name__)
+
+# Upper bound of the checks of one tool running at the same time, whatever
+# its max concurrency, overridable with the
+# mgmtsystem_standards.assessment_runner_workers system parameter
+ASSESSMENT_RUNNER_WORKERS = 16
+# Controls assessed per cron run before the cron re-triggers itself
+ASSESSMENT_CRON_BATCH_SIZE = 1000
+# Ingested result rows applied per batch
+RESULT_INGEST_BATCH_SIZE = 5000
+# Shortest timeout of a command check, in seconds: a check is never unbounded
+COMMAND_MIN_TIMEOUT = 1
+# Exit code of a command check -> check result; other codes fail
+COMMAND_EXIT_RESULTS = {0: 'pass', 1: 'warning'}
+# Control values passed to command checks -> environment variable; the
+# command line itself is never built from (user-editable) control values
+COMMAND_CONTROL_ENV = {
+    'id': 'MGMTSYSTEM_CONTROL_ID',
+    'reference': 'MGMTSYSTEM_CONTROL_REFERENCE',
+    'code': 'MGMTSYSTEM_CONTROL_CODE',
+    'name': 'MGMTSYSTEM_CONTROL_NAME',
+}
+
+
+def run_command_check(tool, control):
+    """Run the command of ``tool`` for ``control`` and map its exit code
+
+    The command line is used as is; the control values listed in
+    ``COMMAND_CONTROL_ENV`` are passed in environment variables, so they
+    can never turn into options or extra arguments. Returns None when the
+    command could not be run or timed out: the check is inconclusive.
+    """
+    try:
+        args = shlex.split(tool['command'] or '')
+    except ValueError as e:
+        _logger.warning("Assessment tool %s has an invalid command: %s", tool['name'], e)
+        return None
+    if not args:
+        return None
+    env = dict(os.environ, **{
+        variable: str(control.get(fname) or '') for fname, variable in COMMAND_CONTROL_ENV.items()
+    })
+    try:
+        completed = subprocess.run(
+            args, env=env, capture_output=True, check=False,
+            timeout=max(tool['timeout'] or 0, COMMAND_MIN_TIMEOUT),
+        )
+    except subprocess.TimeoutExpired:
+        _logger.warning("Assessment tool %s timed out on control %s", tool['name'], control['id'])
+        return None
+    except OSError as e:
+        _logger.warning("Assessment tool %s could not run on control %s: %s", tool['name'], control['id'], e)
+        return None
+    return COMMAND_EXIT_RESULTS.get(completed.returncode, 'fail')
+
+
+class StandardAssessmentRunner(models.AbstractModel):
+    """Automated Assessment Runner
+
+    Runs the checks of the assessment tools linked to automated controls
+    on one thread pool per tool, sized to the tool's concurrency, so a slow
+    tool never holds up the checks of the others. Each check is bounded by
+    the tool's timeout. The worker threads only see plain dictionaries, never the
+    ORM; the results are written back in one batch per result value and
+    appended to the check result history.
+
+    External scanners push their results through
+    :meth:`ingest_automated_check_results`, which shares the same
+    set-based write path.
+
+    Runners are looked up by the tool's ``runner_type`` in
+    :meth:`_get_check_runners`; other modules add theirs by extending the
+    selection and that mapping.
+    """
+    _name = 'mgmtsystem.standard.control.assessment.runner'
+    _description = 'Automated Assessment Runner'
+
+    @api.model
+    def _get_check_runners(self):
+        """Runner type -> callable(tool_vals, control_vals) returning a result or None"""
+        return {'command': run_command_check}
+
+    @api.model
+    def _get_worker_count(self):
+        value = self.env['ir.config_parameter'].sudo().get_param('mgmtsystem_standards.assessment_runner_workers')
+        return max(int(value or ASSESSMENT_RUNNER_WORKERS), 1)
+
+    @api.model
+    def run_assessments(self, controls):
+        """Run the automated checks of ``controls`` and store their results
+
+        :return: dict with the number of checks run, the number of
+                 controls per result and the duration
+        """
+        started = time.monotonic()
+        runners = self._get_check_runners()
+        requested = controls.filtered('automated_check_requested')
+        controls = controls.filtered('automated_assessment')
+        tools = controls.assessment_tools.filtered(lambda tool: tool.runner_type in runners)
+        # The command is restricted to administrators, but any user may run the checks
+        tool_vals = {
+            tool['id']: tool
+            for tool in tools.sudo().read(['name', 'runner_type', 'command', 'timeout', 'max_concurrency'], load=None)
+        }
+        checks = []
+        for control in controls.read(['reference', 'code', 'name', 'assessment_tools'], load=None):
+            control_vals = {fname: control[fname] or '' for fname in COMMAND_CONTROL_ENV}
+            for tool_id in control['assessment_tools']:
+                if tool_id in tool_vals:
+                    checks.append((tool_vals[tool_id], control_vals))
+
+        # The worst result of the tools of a control is kept
+        results = dict.fromkeys(control['id'] for __, control in checks)
+        history = []
+        now = fields.Datetime.now()
+        check_counts = defaultdict(int)
+        for tool, __ in checks:
+            check_counts[tool['id']] += 1
+        worker_count = self._get_worker_count()
+        with ExitStack() as stack:
+            executors = {
+                tool_id: stack.enter_context(ThreadPoolExecutor(
+                    max_workers=min(max(tool_vals[tool_id]['max_concurrency'], 1), worker_count, count),
+                    thread_name_prefix=f'assessment_tool_{tool_id}',
+                ))
+                for tool_id, count in check_counts.items()
+            }
+            futures = [
+                (control['id'], tool['id'], executors[tool['id']].submit(runners[tool['runner_type']], tool, control))
+                for tool, control in checks
+            ]
+            for control_id, tool_id, future in futures:
+                result = future.result()
+                if not result:
+                    continue
+                history.append((control_id, tool_id, now, result))
+                if CHECK_RESULT_CODES[result] >= CHECK_RESULT_CODES.get(results[control_id], -1):
+                    results[control_id] = result
+
+        self._write_check_results({control_id: (result, now) for control_id, result in results.items()})
+        self.env['mgmtsystem.standard.control.check.result']._append_results(history)
+        requested.automated_check_requested = False
+        duration = time.monotonic() - started
+        counts = defaultdict(int)
+        for result in results.values():
+            counts[result or 'inconclusive'] += 1
+        _logger.info(
+            "Ran %d automated checks on %d controls in %.2fs: %s",
+            len(checks), len(controls), duration, dict(counts),
+        )
+        return {'checks': len(checks), 'results': dict(counts), 'duration': duration}
+
+    @api.model
+    def ingest_automated_check_results(self, rows, standard_id=None, batch_size=RESULT_INGEST_BATCH_SIZE):
+        """Store a stream of automated check results of external scanners
+
+        ``rows`` is an iterable of ``(reference, result, timestamp,
+        tool_id)`` tuples or of dicts with these keys; the result is one of
+        ``pass``, ``fail`` or ``warning``, the timestamp defaults to now and
+        the tool is optional. Control references are resolved through one
+        lookup map of the controls the user may write, optionally scoped to
+        ``standard_id``; a reference shared by several controls updates all
+        of them. Rows are applied per batch
+        with one update per result value, and a result older than the
+        control's last check is ignored. Every valid row is appended to the
+        check result history, late ones included.
+
+        :return: dict with the number of rows read, of controls updated and
+                 the unknown references and invalid rows
+        """
+        Control = self.env['mgmtsystem.standard.control']
+        Control.check_access('write')
+        domain = [('reference', '!=', False)]
+        if standard_id:
+            domain.append(('standard_id', '=', standard_id))
+        control_ids = defaultdict(list)
+        for control in Control.search(domain)._filtered_access('write').read(['reference']):
+            control_ids[control['reference']].append(control['id'])
+        Tool = self.env['mgmtsystem.standard.control.assessment.tool']
+        tool_ids = set(Tool.with_context(active_test=False).search([]).ids)
+
+        stats = {'rows': 0, 'updated': 0, 'unknown_references': set(), 'invalid_rows': 0}
+        rows = iter(rows)
+        while batch := list(islice(rows, batch_size)):
+            checks = {}
+            history = []
+            for row in batch:
+                stats['rows'] += 1
+                if isinstance(row, dict):
+                    row = (row.get('reference'), row.get('result'), row.get('timestamp'), row.get('tool_id'))
+                reference, result, timestamp, tool_id = (tuple(row) + (None,) * 4)[:4]
+                if result not in CHECK_RESULT_CODES:
+                    stats['invalid_rows'] += 1
+                    continue
+                if reference not in control_ids:
+                    stats['unknown_references'].add(reference)
+                    continue
+                try:
+                    checked_at = fields.Datetime.to_datetime(timestamp) or fields.Datetime.now()
+                except ValueError:
+                    stats['invalid_rows'] += 1
+                    continue
+                for control_id in control_ids[reference]:
+                    history.append((control_id, tool_id if tool_id in tool_ids else None, checked_at, result))
+                    # Keep the latest result of a control within the batch
+                    if control_id not in checks or checks[control_id][1] <= checked_at:
+                        checks[control_id] = (result, checked_at)
+            stats['updated'] += len(self._write_check_results(checks))
+            self.env['mgmtsystem.standard.control.check.result']._append_results(history)
+        stats['unknown_references'] = sorted(stats['unknown_references'], key=str)
+        return stats
+
+    @api.model
+    def _write_check_results(self, checks):
+        """Store check results with one UPDATE per result value
+
+        ``checks`` maps control ids to ``(result, checked_at)``; a None
+        result only updates the check time. Results older than the
+        control's last check are skipped. The UPDATE bypasses the ORM, so
+        the write access and record rules are checked on the controls
+        first. The dependent fields are recomputed once for all the updated
+        controls.
+
+        :return: the updated controls
+        """
+        Control = self.env['mgmtsystem.standard.control']
+        if not checks:
+            return Control
+        Control.browse(list(checks)).check_access('write')
+        Control.flush_model(['automated_check_result', 'last_automated_check'])
+        grouped = defaultdict(lambda: ([], []))
+        for control_id, (result, checked_at) in checks.items():
+            ids, dates = grouped[result]
+            ids.append(control_id)
+            dates.append(checked_at)
+        updated_ids = []
+        for result, (ids, dates) in grouped.items():
+            self.env.cr.execute("""
+                UPDATE mgmtsystem_standard_control c
+                   SET automated_check_result = COALESCE(%s, c.automated_check_result),
+                       last_automated_check = t.checked_at,
+                       write_uid = %s,
+                       write_date = (now() at time zone 'UTC')
+                  FROM unnest(%s::int[], %s::timestamp[]) AS t(id, checked_at)
+                 WHERE c.id = t.id
+                   AND (c.last_automated_check IS NULL OR c.last_automated_check <= t.checked_at)
+             RETURNING c.id
+            """, [result, self.env.uid, ids, dates])
+            updated_ids.extend(row[0] for row in self.env.cr.fetchall())
+        controls = Control.browse(updated_ids)
+        controls.invalidate_recordset(['automated_check_result', 'last_automated_check', 'write_uid', 'write_date'])
+        controls.modified(['automated_check_result', 'last_automated_check'])
+        return controls
+
+    @api.model
+    def _get_due_controls_domain(self):
+        """Automated controls with a runnable tool queued by a user or not checked in the last day"""
+        return [
+            ('automated_assessment', '=', True),
+            ('assessment_tools.runner_type', 'in', list(self._get_check_runners())),
+            '|', '|',
+            ('automated_check_requested', '=', True),
+            ('last_automated_check', '=', False),
+            ('last_automated_check', '<', fields.Datetime.now() - timedelta(days=1)),
+        ]
+
+    @api.model
+    def _cron_run_automated_assessments(self):
+        """Assess the due automated controls, queued then least recently checked first"""
+        Control = self.env['mgmtsystem.standard.control']
+        domain = self._get_due_controls_domain()
+        total = Control.search_count(domain)
+        controls = Control.search(domain, order='automated_check_requested desc, last_automated_check asc nulls first, id', limit=ASSESSMENT_CRON_BATCH_SIZE)
+        self.run_assessments(controls)
+        self.env['ir.cron']._notify_progress(done=len(controls), remaining=total - len(controls))
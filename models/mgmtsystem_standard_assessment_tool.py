@@ -19,6 +19,30 @@ class StandardAssessmentTool(models.Model):
         ('integration', 'Integration'),
     ], string='Tool Type', default='manual', help='Type of assessment tool.')
 
+    # Automated runner
+    runner_type = fields.Selection([
+        ('none', 'None'),
+        ('command', 'Local Command'),
+    ], string='Runner', default='none', required=True,
+        help='How the automated assessment runner executes the checks of this tool.')
+    command = fields.Char(
+        string='Command',
+        groups='base.group_system',
+        help='Command run once per control, with the control in the MGMTSYSTEM_CONTROL_ID, '
+             'MGMTSYSTEM_CONTROL_REFERENCE, MGMTSYSTEM_CONTROL_CODE and MGMTSYSTEM_CONTROL_NAME '
+             'environment variables. Exit code 0 passes, 1 warns and any other code fails.'
+    )
+    timeout = fields.Integer(
+        string='Timeout (seconds)',
+        default=60,
+        help='Time after which a check is abandoned; at least one second.'
+    )
+    max_concurrency = fields.Integer(
+        string='Max Concurrency',
+        default=4,
+        help='Maximum number of checks of this tool running at the same time.'
+    )
+
     tool_url = fields.Char(string='Tool URL', help='URL for the assessment tool or integration.')
     tool_instructions = fields.Text(string='Tool Instructions', help='Instructions for using the assessment tool.')
 
@@ -78,3 +102,7 @@ class StandardAssessmentTool(models.Model):
         string='Allowed Companies',
         help="Companies that can access this standard"
     )
+
+    _sql_constraints = [
+        ('timeout_positive', 'CHECK(timeout > 0)', 'The timeout of an assessment tool must be at least one second.'),
+    ]
@@ -0,0 +1,512 @@
+# -*- coding: utf-8 -*-
+
+import csv
+import io
+import json
+import logging
+import time
+from collections import Counter, defaultdict
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+# Records buffered before a batch of create() calls
+CATALOG_IMPORT_BATCH_SIZE = 1000
+
+# Tracking, chatter messages and follower subscriptions are useless on
+# catalog content and dominate the cost of bulk creation
+CATALOG_IMPORT_CONTEXT = {
+    'tracking_disable': True,
+    'mail_create_nolog': True,
+    'mail_create_nosubscribe': True,
+    'mail_notrack': True,
+}
+
+# Row type: (model, key field unique per standard, column referencing another row)
+CATALOG_ROW_TYPES = {
+    'standard': ('mgmtsystem.standard', 'code', None),
+    'domain': ('mgmtsystem.standard.domain', 'reference', 'parent_reference'),
+    'requirement': ('mgmtsystem.standard.requirement', 'code', 'parent_code'),
+    'control': ('mgmtsystem.standard.control', 'reference', 'domain_reference'),
+}
+
+# Creation order within a batch: controls are linked to already created domains
+CATALOG_FLUSH_ORDER = ['domain', 'requirement', 'control']
+
+IMPORTABLE_FIELD_TYPES = {
+    'char', 'text', 'html', 'selection', 'integer', 'float', 'boolean', 'date',
+}
+
+
+def iter_csv_rows(stream):
+    """Yield the rows of a binary CSV stream as dicts, one line at a time"""
+    yield from csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+
+
+def iter_jsonl_rows(stream):
+    """Yield the objects of a binary JSON Lines stream, one line at a time"""
+    for line in io.TextIOWrapper(stream, encoding='utf-8-sig'):
+        if line.strip():
+            yield json.loads(line)
+
+
+class StandardCatalogImporter(models.AbstractModel):
+    """Standard Catalog Importer
+
+    Streams a catalog of standards, domains, requirements and controls and
+    creates them in large batches with tracking and chatter disabled. Each
+    row has a ``type`` (standard, domain, requirement or control) and field
+    values; rows reference each other through ``parent_reference`` (domains),
+    ``parent_code`` (requirements) and ``domain_reference`` (controls). A
+    ``standard`` row selects, or creates, the standard the following rows
+    belong to.
+
+    Hierarchy links are applied and the ``parent_path`` of the relinked
+    subtrees rebuilt once at the end of the import, followed by a single
+    recompute of the domain rollups. Rows whose key already exists in the
+    standard are skipped by the import; :meth:`upgrade_catalog` applies
+    them as a diff instead.
+    """
+    _name = 'mgmtsystem.standard.catalog.importer'
+    _description = 'Standard Catalog Importer'
+
+    @api.model
+    def import_catalog(self, rows, standard=None, batch_size=CATALOG_IMPORT_BATCH_SIZE):
+        """Import an iterable of catalog rows
+
+        :param rows: iterable of dicts, e.g. from :func:`iter_csv_rows`
+        :param standard: standard the rows belong to until a ``standard`` row
+        :param batch_size: number of rows buffered per batch of creates
+        :return: dict with the created counts per row type, the number of
+                 rows read and skipped, the duration and the throughput
+        """
+        importer = self.with_context(**CATALOG_IMPORT_CONTEXT)
+        return _CatalogLoad(importer, standard, batch_size).run(rows)
+
+    @api.model
+    def import_catalog_file(self, stream, file_format, standard=None, batch_size=CATALOG_IMPORT_BATCH_SIZE):
+        """Import a binary CSV (``csv``) or JSON Lines (``jsonl``) stream"""
+        return self.import_catalog(self._iter_file_rows(stream, file_format), standard, batch_size)
+
+    @api.model
+    def upgrade_catalog(self, rows, standard, batch_size=CATALOG_IMPORT_BATCH_SIZE):
+        """Upgrade ``standard`` in place to a new version of its catalog
+
+        The rows are diffed against the existing domains, requirements and
+        controls of the standard, matched on their key. Only the differences
+        are applied: new rows are created in batches, records whose values
+        changed are written (one write per distinct set of changes), and
+        records missing from the new catalog are archived; controls are
+        retired. A control row may list the references of the controls it
+        replaces in a ``supersedes`` column: those get ``superseded_by_id``
+        set and are retired. A ``standard`` row updates the standard itself;
+        when it changes the version, the previous version is kept as an
+        archived copy of the standard, superseded by the upgraded one.
+
+        :return: dict with the created, updated and archived counts per row
+                 type, the number of superseded controls, the number of rows
+                 read, the duration and the throughput
+        """
+        standard.ensure_one()
+        importer = self.with_context(**CATALOG_IMPORT_CONTEXT)
+        return _CatalogUpgrade(importer, standard, batch_size).run(rows)
+
+    @api.model
+    def upgrade_catalog_file(self, stream, file_format, standard, batch_size=CATALOG_IMPORT_BATCH_SIZE):
+        """Upgrade ``standard`` from a binary CSV or JSON Lines stream"""
+        return self.upgrade_catalog(self._iter_file_rows(stream, file_format), standard, batch_size)
+
+    @api.model
+    def _iter_file_rows(self, stream, file_format):
+        readers = {'csv': iter_csv_rows, 'jsonl': iter_jsonl_rows}
+        if file_format not in readers:
+            raise UserError(_('Unsupported catalog format: %s', file_format))
+        return readers[file_format](stream)
+
+
+class _CatalogLoad:
+    """State of one catalog import run"""
+
+    def __init__(self, importer, standard, batch_size):
+        self.env = importer.env
+        self.standard = standard or self.env['mgmtsystem.standard']
+        self.batch_size = batch_size
+        # row type -> {(standard id, key): record id or None while buffered}
+        self.keys = defaultdict(dict)
+        self.loaded_standard_ids = set()
+        # row type -> [(vals, key, referenced key)]
+        self.buffers = defaultdict(list)
+        # row type -> [(record id, standard id, parent key)]
+        self.parent_links = defaultdict(list)
+        self.created = Counter()
+        self.skipped = 0
+        self.row_count = 0
+
+    def run(self, rows):
+        started = time.monotonic()
+        for row in rows:
+            self.row_count += 1
+            self._add_row(row)
+        self._finish()
+        self.env.flush_all()
+        duration = time.monotonic() - started
+        result = dict(
+            self._get_result(),
+            rows=self.row_count,
+            duration=duration,
+            rows_per_second=self.row_count / duration if duration else 0.0,
+        )
+        _logger.info(
+            "Loaded catalog: %d rows in %.2fs (%.0f rows/s): %s",
+            self.row_count, duration, result['rows_per_second'], self._get_result(),
+        )
+        return result
+
+    def _get_result(self):
+        return {'created': dict(self.created), 'skipped': self.skipped}
+
+    def _parse_row(self, row):
+        """Row type, field values, key and referenced key of a catalog row"""
+        row_type = (row.get('type') or '').strip().lower()
+        if row_type not in CATALOG_ROW_TYPES:
+            raise UserError(_('Row %(row)s: unknown row type "%(type)s".', row=self.row_count, type=row_type))
+        model_name, key_field, link_column = CATALOG_ROW_TYPES[row_type]
+        vals = self._convert_row(self.env[model_name], row)
+        if row_type == 'standard':
+            return row_type, vals, None, None
+
+        key = vals.get(key_field)
+        if not key:
+            raise UserError(_('Row %(row)s: the %(field)s is missing.', row=self.row_count, field=key_field))
+        if not self.standard:
+            raise UserError(_('Row %s: no standard to import into.', self.row_count))
+        vals['standard_id'] = self.standard.id
+        return row_type, vals, key, str(row.get(link_column) or '').strip()
+
+    def _add_row(self, row):
+        row_type, vals, key, link = self._parse_row(row)
+        if row_type == 'standard':
+            self._flush()
+            self._set_standard(vals)
+            return
+
+        standard_id = self.standard.id
+        self._load_keys(standard_id)
+        if (standard_id, key) in self.keys[row_type]:
+            self.skipped += 1
+            return
+        self.keys[row_type][(standard_id, key)] = None
+        self.buffers[row_type].append((vals, key, link))
+        if sum(len(entries) for entries in self.buffers.values()) >= self.batch_size:
+            self._flush()
+
+    def _finish(self):
+        self._flush()
+        self._link_parents()
+
+    def _convert_row(self, Model, row):
+        """Field values of ``row`` for ``Model``, converted from text when needed"""
+        vals = {}
+        for fname, value in row.items():
+            field = Model._fields.get(fname)
+            if not field or not field.store or field.compute or field.type not in IMPORTABLE_FIELD_TYPES:
+                continue
+            if isinstance(value, str):
+                value = value.strip()
+                if not value:
+                    continue
+                if field.type == 'boolean':
+                    value = value.lower() in ('1', 'true', 'yes', 'y')
+                elif field.type == 'integer':
+                    value = int(value)
+                elif field.type == 'float':
+                    value = float(value)
+                elif field.type == 'date':
+                    value = fields.Date.to_date(value)
+            elif value is None:
+                continue
+            vals[fname] = value
+        return vals
+
+    def _set_standard(self, vals):
+        """Select the standard matching a ``standard`` row, creating it if needed"""
+        if not vals.get('name'):
+            raise UserError(_('Row %s: the standard name is missing.', self.row_count))
+        Standard = self.env['mgmtsystem.standard']
+        # Same rule as mgmtsystem.standard._compute_code
+        code = f"{vals['name']}:{vals['version']}" if vals.get('version') else vals['name']
+        standard = Standard.search([
+            ('code', '=', code),
+            ('company_id', '=', vals.get('company_id', self.env.company.id)),
+        ], limit=1)
+        if standard:
+            self.skipped += 1
+        else:
+            standard = Standard.create(vals)
+            self.created['standard'] += 1
+        self.standard = standard
+
+    def _load_keys(self, standard_id):
+        """Prefetch the keys of the records already in the standard"""
+        if standard_id in self.loaded_standard_ids:
+            return
+        self.loaded_standard_ids.add(standard_id)
+        for row_type in CATALOG_FLUSH_ORDER:
+            model_name, key_field, link_column = CATALOG_ROW_TYPES[row_type]
+            records = self.env[model_name].with_context(active_test=False).search_read(
+                [('standard_id', '=', standard_id)], [key_field],
+            )
+            for record in records:
+                if record[key_field]:
+                    self.keys[row_type][(standard_id, record[key_field])] = record['id']
+
+    def _flush(self):
+        """Create the buffered rows, one create(vals_list) per row type"""
+        for row_type in CATALOG_FLUSH_ORDER:
+            entries = self.buffers.pop(row_type, [])
+            if not entries:
+                continue
+            model_name, key_field, link_column = CATALOG_ROW_TYPES[row_type]
+            if row_type == 'control':
+                for vals, key, link in entries:
+                    if link:
+                        vals['domain_id'] = self._get_linked_id('domain', vals['standard_id'], link)
+            records = self.env[model_name].create([vals for vals, key, link in entries])
+            for record, (vals, key, link) in zip(records, entries):
+                self.keys[row_type][(vals['standard_id'], key)] = record.id
+                if link and row_type != 'control':
+                    self.parent_links[row_type].append((record.id, vals['standard_id'], link))
+            self.created[row_type] += len(records)
+
+    def _get_linked_id(self, row_type, standard_id, key):
+        record_id = self.keys[row_type].get((standard_id, key))
+        if not record_id:
+            raise UserError(_(
+                'Unknown %(type)s "%(key)s" referenced in the catalog; it must appear before the rows referencing it.',
+                type=row_type, key=key,
+            ))
+        return record_id
+
+    def _link_parents(self):
+        """Set all parent links at once and rebuild the linked subtrees' parent_path"""
+        for row_type, links in self.parent_links.items():
+            Model = self.env[CATALOG_ROW_TYPES[row_type][0]]
+            table = SQL.identifier(Model._table)
+            child_ids = [record_id for record_id, standard_id, parent_key in links]
+            parent_ids = [
+                self._get_linked_id(row_type, standard_id, parent_key)
+                for record_id, standard_id, parent_key in links
+            ]
+            Model.flush_model(['parent_id', 'parent_path'])
+            self.env.cr.execute(SQL(
+                """
+                UPDATE %(table)s AS record
+                   SET parent_id = link.parent_id
+                  FROM unnest(%(child_ids)s::int[], %(parent_ids)s::int[]) AS link(id, parent_id)
+                 WHERE record.id = link.id
+                """,
+                table=table, child_ids=child_ids, parent_ids=parent_ids,
+            ))
+            Model.invalidate_model(['parent_id', 'parent_path', 'child_ids'])
+            linked = Model.browse(child_ids)
+            if linked._has_cycle():
+                raise UserError(_('The catalog links %s records into a cycle.', Model._description))
+            self._compute_subtree_parent_paths(Model, child_ids)
+            Model.invalidate_model(['parent_path'])
+            # Everything on the new paths has a changed subtree
+            ancestor_ids = {
+                int(record_id)
+                for parent_path in linked.mapped('parent_path')
+                for record_id in parent_path.split('/') if record_id
+            }
+            Model.browse(ancestor_ids).modified(['parent_id', 'parent_path'])
+
+    def _compute_subtree_parent_paths(self, Model, record_ids):
+        """Rebuild the parent_path of the subtrees of the relinked ``record_ids``
+
+        The subtrees are walked down from the topmost relinked records, whose
+        parents keep their path, so the rest of the table is left untouched.
+        """
+        table = SQL.identifier(Model._table)
+        self.env.cr.execute(SQL(
+            """
+            WITH RECURSIVE ancestor AS (
+                SELECT id AS record_id, parent_id
+                  FROM %(table)s
+                 WHERE id = ANY(%(ids)s)
+                 UNION ALL
+                SELECT ancestor.record_id, parent.parent_id
+                  FROM ancestor
+                  JOIN %(table)s parent ON parent.id = ancestor.parent_id
+            ), tree AS (
+                SELECT record.id, concat(parent.parent_path, record.id, '/') AS parent_path
+                  FROM %(table)s record
+             LEFT JOIN %(table)s parent ON parent.id = record.parent_id
+                 WHERE record.id = ANY(%(ids)s)
+                   AND record.id NOT IN (SELECT record_id FROM ancestor WHERE parent_id = ANY(%(ids)s))
+                 UNION ALL
+                SELECT child.id, concat(tree.parent_path, child.id, '/')
+                  FROM tree
+                  JOIN %(table)s child ON child.parent_id = tree.id
+            )
+            UPDATE %(table)s record
+               SET parent_path = tree.parent_path
+              FROM tree
+             WHERE record.id = tree.id
+            """,
+            table=table, ids=list(record_ids),
+        ))
+
+
+class _CatalogUpgrade(_CatalogLoad):
+    """State of one diff-based catalog upgrade run"""
+
+    def __init__(self, importer, standard, batch_size):
+        super().__init__(importer, standard, batch_size)
+        # row type -> {key: (vals, referenced key, superseded keys)}
+        self.incoming = defaultdict(dict)
+        self.updated = Counter()
+        self.archived = Counter()
+        self.superseded = 0
+
+    def _get_result(self):
+        return {
+            'created': dict(self.created),
+            'updated': dict(self.updated),
+            'archived': dict(self.archived),
+            'superseded': self.superseded,
+        }
+
+    def _add_row(self, row):
+        row_type, vals, key, link = self._parse_row(row)
+        if row_type == 'standard':
+            self._update_standard(vals)
+            return
+        supersedes = []
+        if row_type == 'control':
+            supersedes = [
+                reference.strip()
+                for reference in str(row.get('supersedes') or '').replace(';', ',').split(',')
+                if reference.strip()
+            ]
+        self.incoming[row_type][key] = (vals, link, supersedes)
+
+    def _update_standard(self, vals):
+        current = self.standard.read(list(vals), load=None)[0]
+        changes = {fname: value for fname, value in vals.items() if current[fname] != value}
+        if not changes:
+            return
+        self.standard.write(changes)
+        self.updated['standard'] += 1
+        if 'version' in changes and current['version']:
+            self._keep_previous_version({fname: current[fname] for fname in changes})
+
+    def _keep_previous_version(self, previous_vals):
+        """Record the replaced version as an archived standard superseded by the upgraded one
+
+        Only the standard itself is copied: its content stays on the upgraded
+        standard, where the dropped and replaced controls are retired rather
+        than deleted.
+        """
+        standard = self.standard.with_env(self.env)
+        standard.copy(dict(
+            previous_vals,
+            active=False,
+            state='superseded',
+            superseded_by_id=standard.id,
+        ))
+        self.created['standard'] += 1
+
+    def _finish(self):
+        self._load_keys(self.standard.id)
+        for row_type in CATALOG_FLUSH_ORDER:
+            self._apply_diff(row_type)
+        self._link_parents()
+
+    def _get_archive_vals(self, row_type):
+        if row_type == 'control':
+            return {'state': 'retired', 'retirement_date': fields.Date.today(), 'active': False}
+        return {'active': False}
+
+    def _apply_diff(self, row_type):
+        """Create, update and archive the records of one row type"""
+        standard_id = self.standard.id
+        model_name, key_field, link_column = CATALOG_ROW_TYPES[row_type]
+        link_field = 'domain_id' if row_type == 'control' else 'parent_id'
+        Model = self.env[model_name].with_context(active_test=False)
+        incoming = self.incoming.pop(row_type, {})
+
+        fnames = {key_field, 'active', link_field}
+        if row_type == 'control':
+            fnames.add('superseded_by_id')
+        for vals, link, supersedes in incoming.values():
+            fnames.update(vals)
+        existing = {}
+        for record in Model.search_read([('standard_id', '=', standard_id)], list(fnames), load=None):
+            if record[key_field]:
+                existing[record[key_field]] = record
+        # Current link of each record, as the key of the referenced record
+        link_type = 'domain' if row_type == 'control' else row_type
+        link_keys = {
+            record_id: key
+            for (link_standard_id, key), record_id in self.keys[link_type].items()
+            if link_standard_id == standard_id
+        }
+
+        changes_by_id = {}
+        for key, (vals, link, supersedes) in incoming.items():
+            record = existing.get(key)
+            if record is None:
+                self.keys[row_type][(standard_id, key)] = None
+                self.buffers[row_type].append((vals, key, link))
+                continue
+            changes = {fname: value for fname, value in vals.items() if record[fname] != value}
+            if not record['active']:
+                changes['active'] = True
+            if link_keys.get(record[link_field]) != (link or None):
+                if row_type == 'control':
+                    changes['domain_id'] = self._get_linked_id('domain', standard_id, link) if link else False
+                elif link:
+                    self.parent_links[row_type].append((record['id'], standard_id, link))
+                else:
+                    changes['parent_id'] = False
+            if changes:
+                changes_by_id[record['id']] = changes
+
+        entries = self.buffers.pop(row_type, [])
+        for start in range(0, len(entries), self.batch_size):
+            self.buffers[row_type] = entries[start:start + self.batch_size]
+            self._flush()
+
+        records_by_changes = defaultdict(list)
+        for record_id, changes in changes_by_id.items():
+            records_by_changes[tuple(sorted(changes.items()))].append(record_id)
+        for changes, record_ids in records_by_changes.items():
+            Model.browse(record_ids).write(dict(changes))
+        self.updated[row_type] += len(changes_by_id)
+
+        # Controls dropped from the catalog and replaced by a new control
+        superseded_ids = defaultdict(list)
+        for key, (vals, link, supersedes) in incoming.items():
+            successor_id = self.keys[row_type][(standard_id, key)]
+            for old_key in supersedes:
+                old_record = existing.get(old_key)
+                if not old_record or old_key in incoming:
+                    continue
+                if old_record['active'] or old_record['superseded_by_id'] != successor_id:
+                    superseded_ids[successor_id].append(old_record['id'])
+        for successor_id, record_ids in superseded_ids.items():
+            Model.browse(record_ids).write(dict(self._get_archive_vals(row_type), superseded_by_id=successor_id))
+            self.superseded += len(record_ids)
+
+        superseded = {record_id for record_ids in superseded_ids.values() for record_id in record_ids}
+        archive_ids = [
+            record['id'] for key, record in existing.items()
+            if key not in incoming and record['active'] and record['id'] not in superseded
+        ]
+        if archive_ids:
+            Model.browse(archive_ids).write(self._get_archive_vals(row_type))
+            self.archived[row_type] += len(archive_ids)
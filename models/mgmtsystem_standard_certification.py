@@ -210,11 +210,62 @@ class StandardCertification(models.Model):
     @api.model_create_multi
     def create(self, vals_list):
         """Override create to set sequence if not provided"""
-        for vals in vals_list:
-            if 'sequence' not in vals:
-                vals['sequence'] = self.env['ir.sequence'].next_by_code('mgmtsystem.standard.certification') or 10
+        missing_sequence = [vals for vals in vals_list if 'sequence' not in vals]
+        numbers = self._reserve_sequence_numbers(len(missing_sequence))
+        for vals, number in zip(missing_sequence, numbers):
+            vals['sequence'] = number
         return super().create(vals_list)
 
+    @api.model
+    def _reserve_sequence_numbers(self, count):
+        """Reserve ``count`` numbers of the certification sequence at once
+
+        Standard sequences hand out the block with a single ``nextval`` over
+        ``generate_series``; no-gap sequences advance ``number_next`` by the
+        whole block in one locked update. Sequences with date ranges do the
+        same on the sub-sequence of today's range; the prefix and suffix
+        are never part of the reserved numbers.
+
+        :return: list of ``count`` integers, all 10 when the sequence is not
+                 defined
+        """
+        if not count:
+            return []
+        sequence = self.env['ir.sequence'].sudo().search([
+            ('code', '=', 'mgmtsystem.standard.certification'),
+            ('company_id', 'in', [self.env.company.id, False]),
+        ], order='company_id', limit=1)
+        if not sequence:
+            return [10] * count
+        pg_sequence = 'ir_sequence_%03d' % sequence.id
+        counter = sequence
+        if sequence.use_date_range:
+            # Same lookup as ir.sequence._next()
+            today = fields.Date.today()
+            date_range = self.env['ir.sequence.date_range'].sudo().search([
+                ('sequence_id', '=', sequence.id),
+                ('date_from', '<=', today),
+                ('date_to', '>=', today),
+            ], limit=1) or sequence._create_date_range_seq(today)
+            pg_sequence += '_%03d' % date_range.id
+            counter = date_range
+        if sequence.implementation == 'standard':
+            self.env.cr.execute(
+                "SELECT nextval('%s') FROM generate_series(1, %%s)" % pg_sequence,
+                [count],
+            )
+            return [number for number, in self.env.cr.fetchall()]
+        increment = sequence.number_increment
+        self.env.cr.execute("""
+            UPDATE %s
+               SET number_next = number_next + %%s
+             WHERE id = %%s
+         RETURNING number_next - %%s
+        """ % counter._table, [increment * count, counter.id, increment * count])
+        first, = self.env.cr.fetchone()
+        counter.invalidate_recordset(['number_next'])
+        return [first + increment * index for index in range(count)]
+
     def _compute_display_name(self):
         """Custom name display"""
         for record in self:
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import re
+import time
+from collections import Counter, defaultdict
+
+from odoo import models, api, _
+from odoo.exceptions import UserError
+from odoo.tools import html2plaintext, plaintext2html
+
+from .mgmtsystem_standard_catalog_importer import CATALOG_IMPORT_CONTEXT
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Certifications created or updated per batch
+CIS_IMPORT_BATCH_SIZE = 500
+
+# Normalized CIS benchmark column title -> certification field
+CIS_COLUMN_FIELDS = {
+    'section #': 'section_number',
+    'recommendation #': 'recommendation_number',
+    'title': 'title',
+    'assessment status': 'assessment_status',
+    'status': 'assessment_status',
+    'profile': 'profile',
+    'level': 'level',
+    'description': 'description',
+    'rationale statement': 'rationale_statement',
+    'rationale': 'rationale_statement',
+    'impact statement': 'impact_statement',
+    'impact': 'impact_statement',
+    'remediation procedure': 'remediation_procedure',
+    'remediation': 'remediation_procedure',
+    'audit procedure': 'audit_procedure',
+    'audit': 'audit_procedure',
+    'additional information': 'additional_information',
+    'default value': 'default_value',
+    'references': 'references',
+    'cis controls': 'cis_controls',
+    'v8 ig1': 'cis_safeguards_v8_ig1',
+    'v8 ig2': 'cis_safeguards_v8_ig2',
+    'v8 ig3': 'cis_safeguards_v8_ig3',
+    'v7 ig1': 'cis_safeguards_v7_ig1',
+    'v7 ig2': 'cis_safeguards_v7_ig2',
+    'v7 ig3': 'cis_safeguards_v7_ig3',
+    'cis safeguards v8 ig1': 'cis_safeguards_v8_ig1',
+    'cis safeguards v8 ig2': 'cis_safeguards_v8_ig2',
+    'cis safeguards v8 ig3': 'cis_safeguards_v8_ig3',
+    'cis safeguards v7 ig1': 'cis_safeguards_v7_ig1',
+    'cis safeguards v7 ig2': 'cis_safeguards_v7_ig2',
+    'cis safeguards v7 ig3': 'cis_safeguards_v7_ig3',
+}
+
+# Fixed-decimals number format, e.g. "0.00": recommendation numbers such as
+# 1.10 stored as numbers keep their trailing zeros only through the format
+CIS_FIXED_DECIMALS_FORMAT = re.compile(r'^0\.(0+)$')
+
+CIS_LEVELS = {
+    'level 1': '1',
+    'level 2': '2',
+    'next generation': 'ng',
+}
+
+
+class StandardCertificationImporter(models.AbstractModel):
+    """CIS Benchmark Importer
+
+    Streams the sheets of a CIS benchmark workbook in read-only mode and
+    upserts one certification per recommendation, keyed on
+    ``(standard_id, recommendation_number)``. Existing certifications and
+    controls of the standard are loaded once into lookup dictionaries, so
+    rows are matched and linked without any per-row search. Only the
+    fields that changed are written on existing certifications, with one
+    write per distinct set of changes; a blank cell clears its field.
+    """
+    _name = 'mgmtsystem.standard.certification.importer'
+    _description = 'CIS Benchmark Importer'
+
+    @api.model
+    def import_cis_workbook(self, stream, standard, batch_size=CIS_IMPORT_BATCH_SIZE, sequence_from_source=True):
+        """Import a CIS benchmark ``.xlsx`` workbook into ``standard``
+
+        Every sheet with a "Recommendation #" column is read; the sheet
+        title is used as profile when the sheet has no profile column.
+        With ``sequence_from_source``, certifications are sequenced in the
+        order of the workbook (which follows the section numbers) and no
+        ``ir.sequence`` number is drawn.
+
+        :param stream: binary file-like object or path of the workbook
+        :param standard: ``mgmtsystem.standard`` record
+        :return: dict with the created and updated counts, the number of
+                 rows read, the duration and the throughput
+        """
+        if openpyxl is None:
+            raise UserError(_('The openpyxl library is required to import CIS benchmark workbooks.'))
+        standard.ensure_one()
+        started = time.monotonic()
+        Certification = self.env['mgmtsystem.standard.certification'].with_context(**CATALOG_IMPORT_CONTEXT)
+        existing = self._get_existing_certifications(Certification, standard)
+        control_ids = self._get_control_lookup(standard)
+        stats = Counter()
+        updated_ids = set()
+        seen_numbers = set()
+
+        workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+        try:
+            to_create, to_write = {}, {}
+            for sheet in workbook.worksheets:
+                for vals in self._iter_sheet_vals(Certification, sheet):
+                    stats['rows'] += 1
+                    number = vals['recommendation_number']
+                    if sequence_from_source:
+                        vals['sequence'] = stats['rows'] * 10
+                    vals.update(standard_id=standard.id, company_id=standard.company_id.id)
+                    if number in control_ids:
+                        vals['control_id'] = control_ids[number]
+                    if number in seen_numbers:
+                        # Rows repeated on several sheets complete each other
+                        vals = {fname: value for fname, value in vals.items() if value is not False}
+                    seen_numbers.add(number)
+                    if number in to_create:
+                        to_create[number].update(vals)
+                    elif number in existing:
+                        current = existing[number]
+                        changes = {
+                            fname: value for fname, value in vals.items()
+                            if self._is_changed(Certification, fname, current.get(fname), value)
+                        }
+                        if changes:
+                            to_write.setdefault(current['id'], {}).update(changes)
+                            current.update(changes)
+                    else:
+                        to_create[number] = vals
+                    if len(to_create) + len(to_write) >= batch_size:
+                        self._upsert_batch(Certification, to_create, to_write, existing, stats, updated_ids)
+                        to_create, to_write = {}, {}
+            self._upsert_batch(Certification, to_create, to_write, existing, stats, updated_ids)
+        finally:
+            workbook.close()
+
+        duration = time.monotonic() - started
+        result = {
+            'created': stats['created'],
+            'updated': len(updated_ids),
+            'rows': stats['rows'],
+            'duration': duration,
+            'rows_per_second': stats['rows'] / duration if duration else 0.0,
+        }
+        _logger.info(
+            "Imported CIS benchmark into %s: %d rows in %.2fs, %d created, %d updated",
+            standard.display_name, stats['rows'], duration, stats['created'], len(updated_ids),
+        )
+        return result
+
+    @api.model
+    def _get_existing_certifications(self, Certification, standard):
+        """Current values of the standard's certifications keyed on recommendation number"""
+        fnames = sorted(set(CIS_COLUMN_FIELDS.values()) | {'name', 'sequence', 'control_id', 'company_id'})
+        existing = {}
+        records = Certification.with_context(active_test=False).search_read(
+            [('standard_id', '=', standard.id), ('recommendation_number', '!=', False)],
+            fnames, load=None,
+        )
+        for record in records:
+            record['standard_id'] = standard.id
+            existing[record['recommendation_number']] = record
+        return existing
+
+    @api.model
+    def _get_control_lookup(self, standard):
+        """Controls of the standard keyed on reference and code"""
+        lookup = {}
+        controls = self.env['mgmtsystem.standard.control'].search_read(
+            [('standard_id', '=', standard.id)], ['reference', 'code'],
+        )
+        for control in controls:
+            for key in (control['code'], control['reference']):
+                if key:
+                    lookup[key] = control['id']
+        return lookup
+
+    @api.model
+    def _iter_sheet_vals(self, Certification, sheet):
+        """Yield the certification values of the recommendation rows of a sheet"""
+        rows = sheet.iter_rows()
+        header = next(rows, None) or ()
+        columns = {}
+        for index, title in enumerate(self._get_cell_text(cell) for cell in header):
+            fname = CIS_COLUMN_FIELDS.get(self._normalize_column_title(title))
+            if fname and fname not in columns.values():
+                columns[index] = fname
+        if 'recommendation_number' not in columns.values():
+            return
+        for row in rows:
+            vals = {}
+            # Blank cells clear the field on re-import
+            for index, fname in columns.items():
+                value = self._get_cell_text(row[index]).strip() if index < len(row) else ''
+                vals[fname] = value or False
+            # Section heading rows have no recommendation number
+            if vals.get('recommendation_number'):
+                vals['profile'] = vals.get('profile') or sheet.title
+                yield self._prepare_certification_vals(Certification, vals)
+
+    @api.model
+    def _get_cell_text(self, cell):
+        """Text of a cell as displayed, so numeric cells keep their formatting"""
+        value = getattr(cell, 'value', None)
+        if value is None:
+            return ''
+        if isinstance(value, float):
+            match = CIS_FIXED_DECIMALS_FORMAT.match(getattr(cell, 'number_format', None) or '')
+            if match:
+                return f'{value:.{len(match.group(1))}f}'
+            if value.is_integer():
+                return str(int(value))
+        return str(value)
+
+    @api.model
+    def _normalize_column_title(self, title):
+        return re.sub(r'[\s_]+', ' ', str(title or '')).strip().lower()
+
+    @api.model
+    def _prepare_certification_vals(self, Certification, vals):
+        if 'assessment_status' in vals:
+            status = (vals.pop('assessment_status') or '').lower()
+            if not status or status in dict(Certification._fields['assessment_status'].selection):
+                vals['assessment_status'] = status or False
+        level = vals.pop('level', False) or vals['profile']
+        for label, key in CIS_LEVELS.items():
+            if label in level.lower() or level == key:
+                vals['level'] = key
+                break
+        for fname, value in vals.items():
+            if value and Certification._fields[fname].type == 'html':
+                vals[fname] = plaintext2html(value)
+        vals['title'] = vals.get('title') or vals['recommendation_number']
+        vals['name'] = vals['title']
+        return vals
+
+    @api.model
+    def _is_changed(self, Certification, fname, current, value):
+        """Whether ``value`` differs from the stored ``current`` value
+
+        Html values are compared as plain text: the stored ones went through
+        the html sanitizer, the incoming ones are ``plaintext2html`` output.
+        """
+        if Certification._fields[fname].type == 'html':
+            return html2plaintext(current or '') != html2plaintext(value or '')
+        return current != value
+
+    @api.model
+    def _upsert_batch(self, Certification, to_create, to_write, existing, stats, updated_ids):
+        if to_create:
+            records = Certification.create(list(to_create.values()))
+            for record, (number, vals) in zip(records, to_create.items()):
+                existing[number] = dict(vals, id=record.id)
+            stats['created'] += len(records)
+        # One write per distinct set of changes
+        records_by_changes = defaultdict(list)
+        for record_id, changes in to_write.items():
+            records_by_changes[tuple(sorted(changes.items()))].append(record_id)
+        for changes, record_ids in records_by_changes.items():
+            Certification.browse(record_ids).write(dict(changes))
+        updated_ids.update(to_write)
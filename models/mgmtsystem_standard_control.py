@@ -1,12 +1,45 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 from datetime import datetime, timedelta
 from odoo.exceptions import AccessError, ValidationError
 from odoo import _
 
+# Number of test cycles per year for each test frequency
+FREQUENCY_MULTIPLIERS = {
+    'monthly': 12,
+    'quarterly': 4,
+    'semi_annual': 2,
+    'annual': 1
+}
+
+# Controls handled per run of the testing scheduler before it re-triggers
+CONTROL_TESTING_BATCH_SIZE = 500
+
+# Stored per-control figures summed by the standard and domain cost rollups
+COST_ROLLUP_FIELDS = [
+    'maintenance_cost',
+    'maintenance_cost_combined',
+    'implementation_cost',
+    'total_annual_maintenance_time',
+    'total_annual_maintenance_time_combined',
+    'total_annual_maintenance_hours',
+    'total_annual_maintenance_hours_combined',
+]
+
+# Only implemented or verified controls are effective, at this base score
+EFFECTIVE_STATES = ('implemented', 'verified')
+EFFECTIVENESS_BASE_SCORE = 50
+# Factor applied to the base score of automated controls per check result
+AUTOMATED_RESULT_FACTORS = {
+    'pass': 1.2,
+    'warning': 0.8,
+    'fail': 0.6,
+}
+
+
 class StandardControl(models.Model):
     _name = 'mgmtsystem.standard.control'
     _description = 'Standard Control'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'mgmtsystem.external.id.mixin']
     _check_company_auto = True
 
     name = fields.Char('Name', required=False)
@@ -17,11 +50,6 @@ class StandardControl(models.Model):
     
     active = fields.Boolean('Active', default=True, help="If unchecked, it will allow you to hide this control without removing it.")
 
-    external_id = fields.Char(
-        string="External ID",
-        compute="_compute_external_id",
-        help="External identifier from data import (XML ID)"
-    )
 
     implemented = fields.Boolean('Implemented', compute='_compute_implemented', store=True, 
                                help="Indicates if the control is currently implemented.")
@@ -38,6 +66,7 @@ class StandardControl(models.Model):
         string='Standard',
         required=False,
         ondelete='cascade',
+        index=True,
         help="The framework standard this control is associated with"
     )
 
@@ -55,6 +84,7 @@ class StandardControl(models.Model):
         'mgmtsystem.standard.domain',
         string='Standard Domain',
         tracking=True,
+        index=True,
         help="The domain or category this control belongs to within the standard framework"
     )
 
@@ -119,10 +149,17 @@ class StandardControl(models.Model):
         help="Company to which the control belongs (inherited from parent standard)."
     )
 
+    # Stored copy of the standard's companies: the multi-company record rule
+    # becomes an indexed lookup in the relation table instead of a join
+    # through standard_id
     allowed_company_ids = fields.Many2many(
         'res.company',
+        relation='mgmtsystem_standard_control_company_rel',
+        column1='control_id',
+        column2='company_id',
         string='Allowed Companies',
         related='standard_id.allowed_company_ids',
+        store=True,
         readonly=True,
         help="Companies that can access this control (inherited from parent standard)"
     )
@@ -212,17 +249,19 @@ class StandardControl(models.Model):
     )
     
     # Effectiveness Metrics
-    effectiveness_score = fields.Float('Effectiveness Score', compute='_compute_effectiveness_score')
+    effectiveness_score = fields.Float('Effectiveness Score', compute='_compute_effectiveness_score', store=True)
     last_assessment_date = fields.Date('Last Assessment Date')
     implementation_time = fields.Float('Implementation Time (minutes)', help="Estimated time to implement this control in minutes")
     implementation_cost = fields.Float('Implementation Cost')
     maintenance_time = fields.Float('Manual Test Timing', default=7.5, help="Time in minutes required to maintain/test this control per test cycle")
     maintenance_cost = fields.Float('Annual Maintenance Cost (Manual Only)', 
                                    compute='_compute_maintenance_cost_manual_only',
+                                   store=True,
                                    help="Annual maintenance cost for manual testing only")
     
     maintenance_cost_combined = fields.Float('Annual Maintenance Cost (Manual + Automated)', 
                                            compute='_compute_maintenance_cost_combined',
+                                           store=True,
                                            help="Annual maintenance cost for manual and automated testing combined")
     
     # Base hourly rate for cost calculations
@@ -239,36 +278,42 @@ class StandardControl(models.Model):
     total_annual_maintenance_time = fields.Float(
         string='Total Annual Maintenance Time (minutes)',
         compute='_compute_total_annual_maintenance_time',
+        store=True,
         help='Total maintenance time per year based on test frequency'
     )
     
     total_annual_maintenance_hours = fields.Float(
         string='Total Annual Maintenance Hours',
         compute='_compute_total_annual_maintenance_hours', 
+        store=True,
         help='Total maintenance hours per year'
     )
     
     total_annual_maintenance_time_combined = fields.Float(
         string='Total Annual Maintenance Time (Combined - minutes)',
         compute='_compute_total_annual_maintenance_time_combined',
+        store=True,
         help='Total maintenance time per year using automated when available, otherwise manual (minutes)'
     )
     
     total_annual_maintenance_hours_combined = fields.Float(
         string='Total Annual Maintenance Hours (Combined)',
         compute='_compute_total_annual_maintenance_hours_combined',
+        store=True,
         help='Total maintenance hours per year using automated when available, otherwise manual'
     )
     
     cost_per_minute = fields.Float(
         string='Cost per Minute',
         compute='_compute_cost_per_minute',
+        store=True,
         help='Implementation cost divided by implementation time'
     )
     
     total_first_year_cost = fields.Float(
         string='Total First Year Cost',
         compute='_compute_total_first_year_cost',
+        store=True,
         help='Implementation cost plus first year maintenance cost'
     )
     
@@ -306,7 +351,7 @@ class StandardControl(models.Model):
     ], string='Test Frequency', default='annual',
     help='How often this control should be tested/maintained')
     last_test_date = fields.Date('Last Test Date')
-    next_test_date = fields.Date('Next Test Date', compute='_compute_next_test_date')
+    next_test_date = fields.Date('Next Test Date', compute='_compute_next_test_date', store=True, index='btree_not_null')
     # Commenting out references to non-existent model to avoid errors
     # test_results = fields.One2many('mgmtsystem.standard.control.test', 'control_id', 
     #                               string='Test Results')
@@ -318,6 +363,19 @@ class StandardControl(models.Model):
     implementation_date = fields.Date('Implementation Date', tracking=True, readonly=True)
     verification_date = fields.Date('Verification Date', tracking=True, readonly=True)
     retirement_date = fields.Date('Retirement Date', tracking=True, readonly=True)
+    superseded_by_id = fields.Many2one(
+        'mgmtsystem.standard.control',
+        string='Superseded By',
+        index='btree_not_null',
+        help="Control of a newer catalog version replacing this control"
+    )
+    supersedes_ids = fields.One2many(
+        'mgmtsystem.standard.control',
+        'superseded_by_id',
+        string='Supersedes',
+        context={'active_test': False},
+        help="Controls of earlier catalog versions that this control replaces"
+    )
 
     # Approvers
     approver_id = fields.Many2one('res.users', string='Approved By', tracking=True, readonly=True)
@@ -380,16 +438,9 @@ class StandardControl(models.Model):
     @api.depends('maintenance_time', 'test_frequency')
     def _compute_total_annual_maintenance_time(self):
         """Calculate total annual maintenance time based on test frequency"""
-        frequency_multipliers = {
-            'monthly': 12,
-            'quarterly': 4,
-            'semi_annual': 2, 
-            'annual': 1
-        }
-        
         for record in self:
             if record.maintenance_time and record.test_frequency:
-                multiplier = frequency_multipliers.get(record.test_frequency, 1)
+                multiplier = FREQUENCY_MULTIPLIERS.get(record.test_frequency, 1)
                 record.total_annual_maintenance_time = record.maintenance_time * multiplier
             else:
                 record.total_annual_maintenance_time = 0.0
@@ -403,16 +454,9 @@ class StandardControl(models.Model):
     @api.depends('maintenance_time', 'automated_test_timing', 'automated_assessment', 'test_frequency')
     def _compute_total_annual_maintenance_time_combined(self):
         """Calculate total annual maintenance time using automated when available, otherwise manual"""
-        frequency_multipliers = {
-            'monthly': 12,
-            'quarterly': 4,
-            'semi_annual': 2, 
-            'annual': 1
-        }
-        
         for record in self:
             if record.test_frequency:
-                multiplier = frequency_multipliers.get(record.test_frequency, 1)
+                multiplier = FREQUENCY_MULTIPLIERS.get(record.test_frequency, 1)
                 
                 # Use automated testing if available and enabled, otherwise use manual
                 if record.automated_assessment and record.automated_test_timing:
@@ -435,16 +479,9 @@ class StandardControl(models.Model):
     @api.depends('maintenance_time', 'test_frequency', 'hourly_rate')
     def _compute_maintenance_cost_manual_only(self):
         """Calculate annual maintenance cost for manual testing only"""
-        frequency_multipliers = {
-            'monthly': 12,
-            'quarterly': 4,
-            'semi_annual': 2, 
-            'annual': 1
-        }
-        
         for record in self:
             if record.maintenance_time and record.test_frequency and record.hourly_rate:
-                multiplier = frequency_multipliers.get(record.test_frequency, 1)
+                multiplier = FREQUENCY_MULTIPLIERS.get(record.test_frequency, 1)
                 annual_minutes = record.maintenance_time * multiplier
                 annual_hours = annual_minutes / 60.0
                 record.maintenance_cost = annual_hours * record.hourly_rate
@@ -454,16 +491,9 @@ class StandardControl(models.Model):
     @api.depends('maintenance_time', 'automated_test_timing', 'automated_assessment', 'test_frequency', 'hourly_rate')
     def _compute_maintenance_cost_combined(self):
         """Calculate annual maintenance cost using automated testing when available, otherwise manual"""
-        frequency_multipliers = {
-            'monthly': 12,
-            'quarterly': 4,
-            'semi_annual': 2, 
-            'annual': 1
-        }
-        
         for record in self:
             if record.test_frequency and record.hourly_rate:
-                multiplier = frequency_multipliers.get(record.test_frequency, 1)
+                multiplier = FREQUENCY_MULTIPLIERS.get(record.test_frequency, 1)
                 
                 # Use automated testing if available and enabled, otherwise use manual
                 if record.automated_assessment and record.automated_test_timing:
@@ -497,26 +527,56 @@ class StandardControl(models.Model):
     @api.depends('domain_id', 'maintenance_cost', 'maintenance_cost_combined')
     def _compute_domain_totals(self):
         """Calculate domain-level cost totals"""
+        rollups = self._get_sibling_cost_rollups('domain_id')
         for record in self:
-            if record.domain_id:
-                domain_controls = self.search([('domain_id', '=', record.domain_id.id)])
-                record.domain_total_maintenance_cost_manual = sum(domain_controls.mapped('maintenance_cost'))
-                record.domain_total_maintenance_cost_combined = sum(domain_controls.mapped('maintenance_cost_combined'))
-            else:
-                record.domain_total_maintenance_cost_manual = 0.0
-                record.domain_total_maintenance_cost_combined = 0.0
+            rollup = rollups.get(record.domain_id._origin.id, {})
+            record.domain_total_maintenance_cost_manual = rollup.get('maintenance_cost', 0.0)
+            record.domain_total_maintenance_cost_combined = rollup.get('maintenance_cost_combined', 0.0)
     
     @api.depends('standard_id', 'maintenance_cost', 'maintenance_cost_combined')
     def _compute_standard_totals(self):
         """Calculate standard-level cost totals"""
+        rollups = self._get_sibling_cost_rollups('standard_id')
         for record in self:
-            if record.standard_id:
-                standard_controls = self.search([('standard_id', '=', record.standard_id.id)])
-                record.standard_total_maintenance_cost_manual = sum(standard_controls.mapped('maintenance_cost'))
-                record.standard_total_maintenance_cost_combined = sum(standard_controls.mapped('maintenance_cost_combined'))
-            else:
-                record.standard_total_maintenance_cost_manual = 0.0
-                record.standard_total_maintenance_cost_combined = 0.0
+            rollup = rollups.get(record.standard_id._origin.id, {})
+            record.standard_total_maintenance_cost_manual = rollup.get('maintenance_cost', 0.0)
+            record.standard_total_maintenance_cost_combined = rollup.get('maintenance_cost_combined', 0.0)
+
+    def _get_sibling_cost_rollups(self, groupby):
+        """Cost rollups of the domains or standards the controls belong to
+
+        The distinct groups of the whole batch are aggregated in one query
+        and shared by all of their controls, so listing N controls of one
+        standard costs one query instead of N searches over N siblings. The
+        computed totals live in the ORM cache, which drops them when the
+        controls change.
+
+        :param groupby: ``'domain_id'`` or ``'standard_id'``
+        :return: dict mapping group ids to the totals of ``_read_cost_rollup``
+        """
+        group_ids = self.mapped(groupby)._origin.ids
+        if not group_ids:
+            return {}
+        return self._read_cost_rollup([(groupby, 'in', group_ids)], groupby)
+
+    @api.model
+    def _read_cost_rollup(self, domain, groupby):
+        """Aggregate cost and time figures of the controls matching ``domain``
+
+        All totals for every group are summed from the stored per-control
+        columns in a single grouped query instead of one compute call per
+        control.
+
+        :param domain: search domain selecting the controls to aggregate
+        :param groupby: name of the many2one field to group the controls on
+        :return: dict mapping each group id to a dict with ``control_count``
+                 and one total per field of ``COST_ROLLUP_FIELDS``
+        """
+        aggregates = ['__count'] + [f'{fname}:sum' for fname in COST_ROLLUP_FIELDS]
+        rollups = {}
+        for group, control_count, *totals in self._read_group(domain, [groupby], aggregates):
+            rollups[group.id] = dict(zip(COST_ROLLUP_FIELDS, totals), control_count=control_count)
+        return rollups
     
     # Override maintenance_time field to provide better labeling
     maintenance_time = fields.Float(
@@ -547,32 +607,39 @@ class StandardControl(models.Model):
     # Automated Check
 
     last_automated_check = fields.Datetime('Last Automated Check')
+    automated_check_requested = fields.Boolean(
+        'Automated Check Requested',
+        copy=False,
+        help="Queued for the next run of the automated assessments"
+    )
     automated_check_result = fields.Selection([
         ('pass', 'Pass'),
         ('fail', 'Fail'),
         ('warning', 'Warning')
     ], string='Automated Check Result')
 
-    @api.depends('state', 'automated_check_result')
+    @api.depends('state', 'automated_assessment', 'automated_check_result')
     def _compute_effectiveness_score(self):
+        """Score each control from its (state, automated, check result) tuple
+
+        The score only depends on these three values, so it is computed once
+        per distinct tuple of the batch and then assigned from that table.
+        """
+        scores = {}
         for control in self:
-            if control.state not in ['implemented', 'verified']:
-                control.effectiveness_score = 0
-                continue
-                
-            # Base score (simplified for now)
-            base_score = 50
-            
-            # Adjust based on automated checks if available
-            if control.automated_assessment:
-                if control.automated_check_result == 'pass':
-                    base_score *= 1.2
-                elif control.automated_check_result == 'fail':
-                    base_score *= 0.6
-                elif control.automated_check_result == 'warning':
-                    base_score *= 0.8
-            
-            control.effectiveness_score = min(100, base_score)
+            key = (control.state, control.automated_assessment, control.automated_check_result)
+            if key not in scores:
+                scores[key] = self._get_effectiveness_score(*key)
+            control.effectiveness_score = scores[key]
+
+    @api.model
+    def _get_effectiveness_score(self, state, automated_assessment, automated_check_result):
+        if state not in EFFECTIVE_STATES:
+            return 0
+        score = EFFECTIVENESS_BASE_SCORE
+        if automated_assessment:
+            score *= AUTOMATED_RESULT_FACTORS.get(automated_check_result, 1)
+        return min(100, score)
 
     @api.depends('last_test_date', 'test_frequency')
     def _compute_next_test_date(self):
@@ -592,114 +659,190 @@ class StandardControl(models.Model):
 
     @api.model
     def _cron_check_control_testing(self):
-        """Scheduled action to check controls requiring testing"""
-        due_controls = self.search([
-            ('next_test_date', '<=', fields.Date.today()),
-            ('state', 'in', ['implemented', 'verified'])
-        ])
-        
-        for control in due_controls:
-            self.env['mail.activity'].create({
-                'activity_type_id': self.env.ref('mail.mail_activity_data_todo').id,
-                'note': f'Control {control.code} is due for testing',
-                'user_id': control.control_owner_id.id or self.env.user.id,
-                'res_id': control.id,
-                'res_model_id': self.env['ir.model']._get(self._name).id,
-            })
+        """Scheduled action to check controls requiring testing
+
+        Schedules one test activity per due control, skipping controls that
+        still have an open one. Each run handles a chunk of the backlog and
+        reports the rest to the cron, which commits and runs again.
+        """
+        activity_type = self.env.ref('mgmtsystem_standards.mail_activity_type_control_test')
+        domain = [
+            ('next_test_date', '<=', fields.Date.context_today(self)),
+            ('state', 'in', ['implemented', 'verified']),
+            ('activity_ids', 'not any', [('activity_type_id', '=', activity_type.id)]),
+        ]
+        due_count = self.search_count(domain)
+        due_controls = self.search(domain, order='next_test_date, id', limit=CONTROL_TESTING_BATCH_SIZE)
+        res_model_id = self.env['ir.model']._get_id(self._name)
+        self.env['mail.activity'].create([{
+            'activity_type_id': activity_type.id,
+            'date_deadline': control.next_test_date,
+            'note': f'Control {control.code} is due for testing',
+            'user_id': control.control_owner_id.id or self.env.user.id,
+            'res_id': control.id,
+            'res_model_id': res_model_id,
+        } for control in due_controls])
+        self.env['ir.cron']._notify_progress(
+            done=len(due_controls),
+            remaining=due_count - len(due_controls),
+        )
 
     @api.model
     def is_allowed_state_transition(self, current_state, new_state):
         """Check if the current user is allowed to perform the state transition"""
+        return (current_state, new_state) in self._get_allowed_state_transitions()
+
+    @api.model
+    @tools.ormcache('self.env.uid')
+    def _get_allowed_state_transitions(self):
+        """Transition matrix of the current user
+
+        Cached per user; the cache is cleared together with the group
+        membership caches whenever user groups change.
+
+        :return: frozenset of allowed ``(current_state, new_state)`` pairs
+        """
         user = self.env.user
         #FIXME RB5820: check standard groups
-        return True
         #is_manager = user.has_group('mgmtsystem_standards.group_standard_multi_company_manager')
         is_reviewer = user.has_group('mgmtsystem_standards.group_standard_reviewer')
         is_manager = True
-        
-        # Managers can perform any transition
-        if is_manager:
-            return True
-            
-        # Reviewers can verify implemented controls
-        if is_reviewer and current_state == 'implemented' and new_state == 'verified':
-            return True
-            
-        # Reviewers can mark controls as ineffective
-        if is_reviewer and new_state == 'ineffective':
-            return True
-            
+
+        states = [state for state, label in self._fields['state'].selection]
+        allowed = set()
+        for current_state in [False] + states:
+            for new_state in states:
+                # Managers can perform any transition
+                if is_manager:
+                    allowed.add((current_state, new_state))
+                # Reviewers can verify implemented controls
+                elif is_reviewer and current_state == 'implemented' and new_state == 'verified':
+                    allowed.add((current_state, new_state))
+                # Reviewers can mark controls as ineffective
+                elif is_reviewer and new_state == 'ineffective':
+                    allowed.add((current_state, new_state))
         # Other transitions are not allowed for non-managers
-        return False
+        return frozenset(allowed)
 
     def write(self, vals):
         """Override write to check state transitions"""
         if 'state' in vals:
-            for record in self:
-                if not self.is_allowed_state_transition(record.state, vals['state']):
-                    raise AccessError(_('You are not allowed to change the state of this control.'))
-        
+            allowed = self._get_allowed_state_transitions()
+            if any((state, vals['state']) not in allowed for state in set(self.mapped('state'))):
+                raise AccessError(_('You are not allowed to change the state of this control.'))
         return super().write(vals)
 
+    def _write_workflow_state(self, state, vals=None):
+        """Move the controls not yet in ``state`` there with a single write
+
+        One write for the whole recordset means one round of domain and
+        standard recomputes, however many controls are selected.
+        """
+        controls = self.filtered(lambda control: control.state != state)
+        if controls:
+            controls.write(dict(vals or {}, state=state))
+        return True
+
+    def _raise_for_invalid_controls(self, invalid_controls, message):
+        if invalid_controls:
+            raise ValidationError('\n'.join([message] + invalid_controls.mapped('display_name')))
+
+    def action_export_report(self):
+        """Queue a background PDF export of the control report"""
+        jobs = self.env['mgmtsystem.standard.report.job']._queue_jobs(self)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': _('The report of %(count)s controls is being generated. '
+                             'It will be attached to the standard when ready.', count=len(self)),
+                'type': 'info',
+                'next': {
+                    'type': 'ir.actions.act_window',
+                    'res_model': jobs._name,
+                    'views': [(False, 'list'), (False, 'form')],
+                    'domain': [('id', 'in', jobs.ids)],
+                    'name': _('Report Exports'),
+                },
+            },
+        }
+
+    def action_run_automated_assessment(self):
+        """Queue the automated checks of the controls for the assessment cron
+
+        The checks run external commands, so they are never run within the
+        request: the cron is triggered and picks the queued controls first.
+        """
+        controls = self.filtered('automated_assessment')
+        controls.automated_check_requested = True
+        self.env.ref('mgmtsystem_standards.ir_cron_run_automated_assessments')._trigger()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': _('%(count)s controls queued for automated assessment.', count=len(controls)),
+                'type': 'success',
+            },
+        }
+
     def action_submit_review(self):
-        """Submit control for review"""
-        self.ensure_one()
-        if not self.control_owner_id:
-            raise ValidationError(_('Please assign a control owner before submitting for review.'))
-        self.write({'state': 'review'})
+        """Submit controls for review"""
+        self._raise_for_invalid_controls(
+            self.filtered(lambda control: not control.control_owner_id),
+            _('Please assign a control owner before submitting for review.'),
+        )
+        return self._write_workflow_state('review')
 
     def action_approve(self):
-        """Approve control for implementation"""
-        self.ensure_one()
+        """Approve controls for implementation"""
         if not self.env.user.has_group('mgmtsystem_standards.group_standard_multi_company_manager'):
             raise AccessError(_('Only managers can approve controls.'))
-        self.write({
-            'state': 'approved',
+        return self._write_workflow_state('approved', {
             'approval_date': fields.Date.today(),
             'approver_id': self.env.user.id
         })
 
     def action_start_implementation(self):
         """Start control implementation"""
-        self.ensure_one()
-        if self.state != 'approved':
-            raise ValidationError(_('Control must be approved before implementation.'))
-        self.write({'state': 'implementing'})
+        self._raise_for_invalid_controls(
+            self.filtered(lambda control: control.state not in ['approved', 'implementing']),
+            _('Control must be approved before implementation.'),
+        )
+        return self._write_workflow_state('implementing')
 
     def action_mark_implemented(self):
-        """Mark control as implemented"""
-        self.ensure_one()
-        self.write({
-            'state': 'implemented',
+        """Mark controls as implemented"""
+        return self._write_workflow_state('implemented', {
             'implementation_date': fields.Date.today()
         })
 
     def action_start_testing(self):
         """Start control testing"""
-        self.ensure_one()
-        if self.state not in ['implemented', 'ineffective']:
-            raise ValidationError(_('Control must be implemented before testing.'))
-        self.write({'state': 'testing'})
+        self._raise_for_invalid_controls(
+            self.filtered(lambda control: control.state not in ['implemented', 'ineffective', 'testing']),
+            _('Control must be implemented before testing.'),
+        )
+        return self._write_workflow_state('testing')
 
     def action_mark_verified(self):
-        """Mark control as verified after successful testing"""
-        self.ensure_one()
+        """Mark controls as verified after successful testing"""
         if not self.env.user.has_group('mgmtsystem_standards.group_standard_reviewer'):
             raise AccessError(_('Only reviewers can verify controls.'))
-        if not self.last_test_date or self.last_test_date < fields.Date.today() - timedelta(days=30):
-            raise ValidationError(_('A recent test (within 30 days) is required before verification.'))
-        self.write({
-            'state': 'verified',
+        recent_test_date = fields.Date.today() - timedelta(days=30)
+        self._raise_for_invalid_controls(
+            self.filtered(lambda control: not control.last_test_date or control.last_test_date < recent_test_date),
+            _('A recent test (within 30 days) is required before verification.'),
+        )
+        return self._write_workflow_state('verified', {
             'verification_date': fields.Date.today(),
             'verifier_id': self.env.user.id
         })
 
     def action_mark_ineffective(self):
-        """Mark control as ineffective and create improvement action"""
-        self.ensure_one()
+        """Mark controls as ineffective and create improvement action"""
         if not self.env.user.has_group('mgmtsystem_standards.group_standard_reviewer'):
             raise AccessError(_('Only reviewers can mark controls as ineffective.'))
-        self.write({'state': 'ineffective'})
+        return self._write_workflow_state('ineffective')
         
         # Commented out action creation to avoid potential dependency errors
         # Create improvement action
@@ -725,12 +868,10 @@ class StandardControl(models.Model):
         # })
 
     def action_retire(self):
-        """Retire a control"""
-        self.ensure_one()
+        """Retire controls"""
         if not self.env.user.has_group('mgmtsystem_standards.group_standard_multi_company_manager'):
             raise AccessError(_('Only managers can retire controls.'))
-        self.write({
-            'state': 'retired',
+        return self._write_workflow_state('retired', {
             'retirement_date': fields.Date.today(),
             'active': False
         })
@@ -754,15 +895,3 @@ class StandardControl(models.Model):
         """Determine if control is implemented based on its state"""
         for control in self:
             control.implemented = control.state in ['implemented', 'verified']
-
-    def _compute_external_id(self):
-        """Compute the external ID (XML ID) for this record"""
-        for record in self:
-            data = self.env['ir.model.data'].search([
-                ('model', '=', record._name),
-                ('res_id', '=', record.id)
-            ], limit=1)
-            if data:
-                record.external_id = f"{data.module}.{data.name}"
-            else:
-                record.external_id = False
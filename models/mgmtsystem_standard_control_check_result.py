@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import create_index
+
+# Stored result code of each check result; also their severity order
+CHECK_RESULT_CODES = {'pass': 0, 'warning': 1, 'fail': 2}
+# Level of the pass rate aggregates -> (model, grouping column of the control)
+PASS_RATE_LEVELS = {
+    'control': ('mgmtsystem.standard.control', 'id'),
+    'domain': ('mgmtsystem.standard.domain', 'domain_id'),
+    'standard': ('mgmtsystem.standard', 'standard_id'),
+}
+
+
+class SmallInteger(fields.Integer):
+    """Integer field stored in a 2-byte ``smallint`` column
+
+    For small codes of large tables; the ORM creates the column, and
+    converts an existing ``int4`` one, from ``column_type``.
+    """
+    column_type = ('int2', 'smallint')
+
+
+class StandardControlCheckResult(models.Model):
+    """Control Check Result History
+
+    Append-only time series of the automated check results of controls:
+    one narrow row per check, without the ORM audit columns and with the
+    result as a ``smallint`` code, appended with one set-based insert per
+    batch. The table is scanned by time ranges only, so it has a BRIN index
+    on ``checked_at`` (tiny, and effective as rows arrive in time order)
+    next to a btree on ``(control_id, checked_at)`` for the history of a
+    single control.
+    """
+    _name = 'mgmtsystem.standard.control.check.result'
+    _description = 'Control Check Result History'
+    _order = 'checked_at desc, id desc'
+    _log_access = False
+
+    control_id = fields.Many2one(
+        'mgmtsystem.standard.control',
+        string='Control',
+        required=True,
+        ondelete='cascade',
+    )
+    tool_id = fields.Many2one(
+        'mgmtsystem.standard.control.assessment.tool',
+        string='Assessment Tool',
+        ondelete='set null',
+    )
+    checked_at = fields.Datetime(string='Checked At', required=True)
+    result_code = SmallInteger(string='Result Code', required=True, help="0: pass, 1: warning, 2: fail")
+    result = fields.Selection([
+        ('pass', 'Pass'),
+        ('warning', 'Warning'),
+        ('fail', 'Fail'),
+    ], string='Result', compute='_compute_result')
+
+    def init(self):
+        create_index(
+            self.env.cr,
+            'mgmtsystem_standard_control_check_result_checked_at_brin',
+            self._table,
+            ['checked_at'],
+            method='brin',
+        )
+        create_index(
+            self.env.cr,
+            'mgmtsystem_standard_control_check_result_control_checked_at_index',
+            self._table,
+            ['control_id', 'checked_at'],
+        )
+
+    @api.depends('result_code')
+    def _compute_result(self):
+        results = {code: result for result, code in CHECK_RESULT_CODES.items()}
+        for record in self:
+            record.result = results.get(record.result_code)
+
+    def write(self, vals):
+        raise UserError(_('Check results are append-only and cannot be modified.'))
+
+    @api.model
+    def _append_results(self, rows):
+        """Append ``(control_id, tool_id, checked_at, result)`` rows in one insert"""
+        if not rows:
+            return
+        control_ids, tool_ids, dates, codes = (list(column) for column in zip(*(
+            (control_id, tool_id or None, checked_at, CHECK_RESULT_CODES[result])
+            for control_id, tool_id, checked_at, result in rows
+        )))
+        self.env.cr.execute("""
+            INSERT INTO mgmtsystem_standard_control_check_result
+                   (control_id, tool_id, checked_at, result_code)
+            SELECT control_id, tool_id, checked_at, result_code
+              FROM unnest(%s::int[], %s::int[], %s::timestamp[], %s::smallint[])
+                AS t(control_id, tool_id, checked_at, result_code)
+        """, [control_ids, tool_ids, dates, codes])
+
+    @api.model
+    def _get_scope(self, level, ids):
+        """Grouping column and the readable ids of ``level`` to aggregate"""
+        if level not in PASS_RATE_LEVELS:
+            raise UserError(_('Unknown pass rate level: %s', level))
+        model_name, column = PASS_RATE_LEVELS[level]
+        self.check_access('read')
+        domain = [('id', 'in', list(ids))] if ids is not None else []
+        return column, self.env[model_name].with_context(active_test=False).search(domain).ids
+
+    @api.model
+    def get_pass_rates(self, level='control', days=30, ids=None, date_to=None):
+        """Pass rate of each control, domain or standard over the last ``days``
+
+        :param level: ``control``, ``domain`` or ``standard``
+        :param ids: ids of the records of ``level`` (default: all readable)
+        :return: {id: {'checks': int, 'passes': int, 'pass_rate': float}}
+        """
+        column, scope_ids = self._get_scope(level, ids)
+        date_to = fields.Date.to_date(date_to) or fields.Date.context_today(self)
+        self.env.cr.execute("""
+            SELECT c.%(column)s, count(*), count(*) FILTER (WHERE r.result_code = 0)
+              FROM mgmtsystem_standard_control_check_result r
+              JOIN mgmtsystem_standard_control c ON c.id = r.control_id
+             WHERE r.checked_at >= %%s AND r.checked_at < %%s
+               AND c.%(column)s = ANY(%%s)
+          GROUP BY c.%(column)s
+        """ % {'column': column}, [date_to - timedelta(days=days - 1), date_to + timedelta(days=1), scope_ids])
+        return {
+            key: {'checks': checks, 'passes': passes, 'pass_rate': passes / checks}
+            for key, checks, passes in self.env.cr.fetchall()
+        }
+
+    @api.model
+    def get_pass_rate_series(self, level='standard', days=365, window=30, ids=None, date_to=None):
+        """Daily rolling pass rate of each control, domain or standard
+
+        For each day with results in the last ``days``, the pass rate over
+        the ``window`` days ending that day, computed by a window function
+        over the daily counts.
+
+        :return: list of dicts with the ``id``, ``day``, the day's
+                 ``checks`` and ``passes`` and the rolling ``pass_rate``,
+                 ordered by id and day
+        """
+        column, scope_ids = self._get_scope(level, ids)
+        date_to = fields.Date.to_date(date_to) or fields.Date.context_today(self)
+        date_from = date_to - timedelta(days=days - 1)
+        self.env.cr.execute("""
+            WITH daily AS (
+                SELECT c.%(column)s AS key,
+                       r.checked_at::date AS day,
+                       count(*) AS checks,
+                       count(*) FILTER (WHERE r.result_code = 0) AS passes
+                  FROM mgmtsystem_standard_control_check_result r
+                  JOIN mgmtsystem_standard_control c ON c.id = r.control_id
+                 WHERE r.checked_at >= %%(start)s AND r.checked_at < %%(stop)s
+                   AND c.%(column)s = ANY(%%(ids)s)
+              GROUP BY 1, 2
+            )
+            SELECT key, day, checks, passes,
+                   (sum(passes) OVER w)::float / (sum(checks) OVER w)
+              FROM daily
+            WINDOW w AS (PARTITION BY key ORDER BY day
+                         RANGE BETWEEN %%(preceding)s::interval PRECEDING AND CURRENT ROW)
+          ORDER BY key, day
+        """ % {'column': column}, {
+            # Results before the series start still count in the first windows
+            'start': date_from - timedelta(days=window - 1),
+            'stop': date_to + timedelta(days=1),
+            'ids': scope_ids,
+            'preceding': f'{window - 1} days',
+        })
+        return [
+            {'id': key, 'day': day, 'checks': checks, 'passes': passes, 'pass_rate': pass_rate}
+            for key, day, checks, passes, pass_rate in self.env.cr.fetchall()
+            if day >= date_from
+        ]
@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
 
 from odoo import models, fields, api, _
+from odoo.tools import SQL
+
+from .mgmtsystem_standard_control import COST_ROLLUP_FIELDS
+
+# Control figures summed over the subtree of a domain: the cost rollups and
+# the scores the domain average effectiveness is computed from
+SUBTREE_ROLLUP_FIELDS = COST_ROLLUP_FIELDS + ['effectiveness_score']
 
 
 class StandardDomain(models.Model):
@@ -11,7 +18,7 @@ class StandardDomain(models.Model):
     """
     _name = "mgmtsystem.standard.domain"
     _description = "Standard Domain"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'mgmtsystem.external.id.mixin', 'mgmtsystem.due.date.mixin']
     _parent_name = 'parent_id'  # 🛡️ SECURITY: Define parent field for hierarchy
     _parent_store = True  # 🛡️ SECURITY: Store parent-child relationships for hierarchy integrity
     _order = "parent_left,sequence, id"
@@ -134,6 +141,14 @@ class StandardDomain(models.Model):
         help="Standard controls within this domain"
     )
 
+    # Controls whose domain_id points at this domain; drives the subtree rollups
+    direct_control_ids = fields.One2many(
+        'mgmtsystem.standard.control',
+        'domain_id',
+        string="Direct Controls",
+        help="Controls assigned to this domain through their Standard Domain field"
+    )
+
     product_ids = fields.Many2many(
         'product.product',
         string="Related Products",
@@ -188,24 +203,32 @@ class StandardDomain(models.Model):
     domain_total_maintenance_cost_manual = fields.Float(
         string='Total Maintenance Cost (Manual Only)',
         compute='_compute_domain_costs',
+        store=True,
+        recursive=True,
         help='Total annual maintenance cost for all controls in this domain (manual only)'
     )
     
     domain_total_maintenance_cost_combined = fields.Float(
         string='Total Maintenance Cost (Manual + Automated)',
         compute='_compute_domain_costs',
+        store=True,
+        recursive=True,
         help='Total annual maintenance cost for all controls in this domain (manual + automated)'
     )
     
     domain_total_implementation_cost = fields.Float(
         string='Total Implementation Cost',
         compute='_compute_domain_costs',
+        store=True,
+        recursive=True,
         help='Total implementation cost for all controls in this domain'
     )
     
     domain_control_count = fields.Integer(
         string='Control Count',
         compute='_compute_domain_costs',
+        store=True,
+        recursive=True,
         help='Number of controls in this domain'
     )
     
@@ -213,27 +236,44 @@ class StandardDomain(models.Model):
     domain_total_maintenance_time_manual = fields.Float(
         string='Total Maintenance Time (Manual Only - minutes)',
         compute='_compute_domain_costs',
+        store=True,
+        recursive=True,
         help='Total annual maintenance time for all controls in this domain (manual only)'
     )
     
     domain_total_maintenance_time_combined = fields.Float(
         string='Total Maintenance Time (Combined - minutes)',
         compute='_compute_domain_costs',
+        store=True,
+        recursive=True,
         help='Total annual maintenance time for all controls in this domain (automated when available)'
     )
     
     domain_total_maintenance_hours_manual = fields.Float(
         string='Total Maintenance Hours (Manual Only)',
         compute='_compute_domain_costs',
+        store=True,
+        recursive=True,
         help='Total annual maintenance hours for all controls in this domain (manual only)'
     )
     
     domain_total_maintenance_hours_combined = fields.Float(
         string='Total Maintenance Hours (Combined)',
         compute='_compute_domain_costs',
+        store=True,
+        recursive=True,
         help='Total annual maintenance hours for all controls in this domain (automated when available)'
     )
 
+    domain_average_effectiveness_score = fields.Float(
+        string='Average Effectiveness',
+        compute='_compute_domain_costs',
+        store=True,
+        recursive=True,
+        aggregator='avg',
+        help='Average effectiveness score of the controls in this domain and its subdomains'
+    )
+
 
     company_id = fields.Many2one(
         'res.company',
@@ -244,11 +284,17 @@ class StandardDomain(models.Model):
         help='Company this domain belongs to (inherited from parent standard)'
     )
 
-    # Remove complex many2many definition
+    # Stored copy of the standard's companies: the multi-company record rule
+    # becomes an indexed lookup in the relation table instead of a join
+    # through standard_id
     allowed_company_ids = fields.Many2many(
         'res.company',
+        relation='mgmtsystem_standard_domain_company_rel',
+        column1='domain_id',
+        column2='company_id',
         string='Allowed Companies',
         related='standard_id.allowed_company_ids',
+        store=True,
         readonly=True,
         help="Companies that can access this domain (inherited from parent standard)"
     )
@@ -259,11 +305,6 @@ class StandardDomain(models.Model):
         help="User responsible for this domain"
     )
     
-    external_id = fields.Char(
-        string="External ID",
-        compute="_compute_external_id",
-        help="External identifier from data import (XML ID)"
-    )
         
     active = fields.Boolean(
         default=True, 
@@ -274,19 +315,22 @@ class StandardDomain(models.Model):
     control_count = fields.Integer(
         compute="_compute_statistics",
         string="Total Controls",
-        store=True
+        store=True,
+        recursive=True
     )
     
     implemented_control_count = fields.Integer(
         compute="_compute_statistics",
         string="Implemented Controls", 
-        store=True
+        store=True,
+        recursive=True
     )   
     
     child_domain_count = fields.Integer(
         compute="_compute_statistics",
         string="Child Domains",
         store=True,
+        recursive=True,
         help="Number of child domains under this domain"
     )
     
@@ -300,50 +344,106 @@ class StandardDomain(models.Model):
             else:
                 record.path_level = record.parent_id.path_level + 1
     
-    @api.depends('control_ids', 'control_ids.implemented', 'child_ids', 'child_ids.control_ids', 'child_ids.control_ids.implemented')
+    @api.depends('parent_path', 'direct_control_ids.active', 'direct_control_ids.implemented',
+                 'child_ids', 'child_ids.active', 'child_ids.control_count', 'child_ids.implemented_control_count')
     def _compute_statistics(self):
-        """Compute control statistics for this domain and all descendants"""
+        """Compute control statistics for this domain and all descendants
+
+        The counts of the whole batch come from a single parent_path query,
+        so a bulk state change on many controls does not fan out into one
+        descendant search and one control search per domain.
+        """
+        rollups = self._read_subtree_control_totals()
         for record in self:
-            # Get all descendant domains using parent_path for efficiency
-            descendant_domains = record._get_all_descendant_domains()
-            
-            # Count all controls from this domain and all descendants
-            all_controls = record.env['mgmtsystem.standard.control'].search([
-                ('domain_id', 'in', descendant_domains.ids + [record.id])
-            ])
-            
-            record.control_count = len(all_controls)
-            
-            implemented = all_controls.filtered(lambda c: c.implemented)
-            record.implemented_control_count = len(implemented)
+            rollup = rollups.get(record._origin.id, {})
+            record.control_count = rollup.get('control_count', 0)
+            record.implemented_control_count = rollup.get('implemented_control_count', 0)
             
             # Count direct child domains only (immediate children)
             record.child_domain_count = len(record.child_ids)
     
-    @api.depends('control_ids', 'control_ids.maintenance_cost', 'control_ids.maintenance_cost_combined', 
-                 'control_ids.implementation_cost', 'control_ids.total_annual_maintenance_time',
-                 'control_ids.total_annual_maintenance_time_combined')
+    @api.depends('parent_path', 'direct_control_ids.active',
+                 *('direct_control_ids.%s' % fname for fname in SUBTREE_ROLLUP_FIELDS),
+                 'child_ids.active', 'child_ids.domain_control_count',
+                 'child_ids.domain_total_maintenance_cost_manual', 'child_ids.domain_total_maintenance_cost_combined',
+                 'child_ids.domain_total_implementation_cost', 'child_ids.domain_total_maintenance_time_manual',
+                 'child_ids.domain_total_maintenance_time_combined', 'child_ids.domain_average_effectiveness_score')
     def _compute_domain_costs(self):
-        """Compute cost and time statistics for all controls in this domain"""
+        """Compute cost and time statistics for all controls in this domain and its subdomains
+
+        The totals are stored and maintained bottom-up: a change on a control
+        only recomputes its domain and the ancestors along its parent_path,
+        and each batch of domains is aggregated in a single query.
+        """
+        rollups = self._read_subtree_control_totals()
         for record in self:
-            # Get all descendant domains using parent_path for efficiency
-            descendant_domains = record._get_all_descendant_domains()
-            
-            # Get all controls from this domain and all descendants
-            all_controls = record.env['mgmtsystem.standard.control'].search([
-                ('domain_id', 'in', descendant_domains.ids + [record.id])
-            ])
-            
-            record.domain_control_count = len(all_controls)
-            record.domain_total_maintenance_cost_manual = sum(all_controls.mapped('maintenance_cost'))
-            record.domain_total_maintenance_cost_combined = sum(all_controls.mapped('maintenance_cost_combined'))
-            record.domain_total_implementation_cost = sum(all_controls.mapped('implementation_cost'))
+            rollup = rollups.get(record._origin.id, {})
+            record.domain_control_count = rollup.get('control_count', 0)
+            record.domain_total_maintenance_cost_manual = rollup.get('maintenance_cost', 0.0)
+            record.domain_total_maintenance_cost_combined = rollup.get('maintenance_cost_combined', 0.0)
+            record.domain_total_implementation_cost = rollup.get('implementation_cost', 0.0)
             
             # Time calculations
-            record.domain_total_maintenance_time_manual = sum(all_controls.mapped('total_annual_maintenance_time'))
-            record.domain_total_maintenance_time_combined = sum(all_controls.mapped('total_annual_maintenance_time_combined'))
+            record.domain_total_maintenance_time_manual = rollup.get('total_annual_maintenance_time', 0.0)
+            record.domain_total_maintenance_time_combined = rollup.get('total_annual_maintenance_time_combined', 0.0)
             record.domain_total_maintenance_hours_manual = record.domain_total_maintenance_time_manual / 60.0
             record.domain_total_maintenance_hours_combined = record.domain_total_maintenance_time_combined / 60.0
+            record.domain_average_effectiveness_score = (
+                rollup['effectiveness_score'] / rollup['control_count'] if rollup.get('control_count') else 0.0
+            )
+
+    def _read_subtree_control_totals(self):
+        """Aggregate the active controls of each domain and its active descendants
+
+        Descendants are matched on the parent_path prefix, so the totals of
+        the whole batch come from one query whatever the depth of the tree.
+        A descendant only counts when every domain between it and the
+        aggregated one is active, as the totals propagate through the
+        (active) ``child_ids`` of each level.
+
+        :return: dict mapping domain ids to dicts with ``control_count``,
+                 ``implemented_control_count`` and one total per field of
+                 ``SUBTREE_ROLLUP_FIELDS``
+        """
+        domain_ids = self._origin.ids
+        if not domain_ids:
+            return {}
+        self.flush_model(['parent_path', 'standard_id', 'active'])
+        self.env['mgmtsystem.standard.control'].flush_model(['domain_id', 'active', 'implemented'] + SUBTREE_ROLLUP_FIELDS)
+        self.env.cr.execute(SQL(
+            """
+            SELECT d.id, COUNT(c.id), COUNT(c.id) FILTER (WHERE c.implemented), %(totals)s
+              FROM mgmtsystem_standard_domain d
+              JOIN mgmtsystem_standard_domain sub
+                ON starts_with(sub.parent_path, d.parent_path)
+               AND sub.standard_id = d.standard_id
+               AND NOT EXISTS (
+                       SELECT 1
+                         FROM mgmtsystem_standard_domain mid
+                        WHERE mid.id = ANY(string_to_array(
+                                  rtrim(substr(sub.parent_path, length(d.parent_path) + 1), '/'), '/'
+                              )::int[])
+                          AND NOT mid.active
+                   )
+              JOIN mgmtsystem_standard_control c
+                ON c.domain_id = sub.id
+               AND c.active
+             WHERE d.id IN %(domain_ids)s
+             GROUP BY d.id
+            """,
+            totals=SQL(", ").join(
+                SQL("COALESCE(SUM(%s), 0)", SQL.identifier('c', fname)) for fname in SUBTREE_ROLLUP_FIELDS
+            ),
+            domain_ids=tuple(domain_ids),
+        ))
+        return {
+            domain_id: dict(
+                zip(SUBTREE_ROLLUP_FIELDS, totals),
+                control_count=control_count,
+                implemented_control_count=implemented_control_count,
+            )
+            for domain_id, control_count, implemented_control_count, *totals in self.env.cr.fetchall()
+        }
     
     def _get_all_descendant_domains(self):
         """Get all descendant domains efficiently using parent_path"""
@@ -358,7 +458,7 @@ class StandardDomain(models.Model):
         ])
     
     
-    @api.depends('control_ids.implemented', 'control_count')
+    @api.depends('control_count', 'implemented_control_count')
     def _compute_compliance_score(self):
         """Compute compliance score based on implemented controls"""
         for record in self:
@@ -366,17 +466,6 @@ class StandardDomain(models.Model):
                 record.compliance_score = (record.implemented_control_count / record.control_count) * 100
             else:
                 record.compliance_score = 0    
-    def _compute_external_id(self):
-        """Compute the external ID (XML ID) for this record"""
-        for record in self:
-            data = self.env['ir.model.data'].search([
-                ('model', '=', record._name),
-                ('res_id', '=', record.id)
-            ], limit=1)
-            if data:
-                record.external_id = f"{data.module}.{data.name}"
-            else:
-                record.external_id = False    
     def _compute_display_name(self):
         """Custom name display to include the reference code"""
         for record in self:
@@ -400,25 +489,23 @@ class StandardDomain(models.Model):
             }
         }
     
-    @api.model_create_multi
-    def create(self, vals_list):
-        """Ensure company_id is always included in allowed_company_ids"""
-        records = super().create(vals_list)
-        for record in records:
-            if record.company_id and record.company_id not in record.allowed_company_ids:
-                record.allowed_company_ids = [(4, record.company_id.id)]
-        return records
-    
-    def write(self, vals):
-        """Ensure company_id is always included in allowed_company_ids when updated"""
-        result = super().write(vals)
-        # Check if either company_id or allowed_company_ids was modified
-        if 'company_id' in vals or 'allowed_company_ids' in vals:
-            for record in self:
-                if record.company_id and record.company_id not in record.allowed_company_ids:
-                    record.allowed_company_ids = [(4, record.company_id.id)]
-        return result
-    
+    @api.model
+    def _get_digest_trigger_fields(self):
+        return super()._get_digest_trigger_fields() | {'owner_id'}
+
+    def _get_digest_users(self):
+        users = super()._get_digest_users()
+        if all(record.owner_id for record in self):
+            users &= self.owner_id
+        return users
+
+    @api.model
+    def _get_user_scope_domain(self, user):
+        """Domains owned by someone else are left out of the user's digest"""
+        return super()._get_user_scope_domain(user) + [
+            '|', ('owner_id', '=', False), ('owner_id', '=', user.id),
+        ]
+
     def action_rebuild_parent_store(self):
         """Rebuild the nested set model (parent_left/right) for all domains"""
         self.env['mgmtsystem.standard.domain']._parent_store_compute()
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import config
+from odoo.tools.pdf import merge_pdf
+
+_logger = logging.getLogger(__name__)
+
+# Controls rendered per wkhtmltopdf call
+REPORT_JOB_CHUNK_SIZE = 100
+# Chunks rendered per cron run, so a run stays well within the cron timeout
+REPORT_JOB_CHUNKS_PER_RUN = 20
+# Chunks rendered at the same time, overridable with the
+# mgmtsystem_standards.report_job_workers system parameter. Each worker
+# holds a database connection of the pool next to the cron's own, so the
+# count is capped at db_maxconn - 1.
+REPORT_JOB_WORKERS = 4
+# Age after which a running job is considered dead when the cron has no
+# time limit (limit_time_real_cron and limit_time_real set to 0)
+REPORT_JOB_STALE_TIMEOUT = 3600
+REPORT_JOB_REPORT = 'mgmtsystem_standards.action_report_standard_control'
+# Name of the attachments holding the rendered chunks: prefix, chunk index, suffix
+REPORT_JOB_CHUNK_PREFIX = 'chunk-'
+REPORT_JOB_CHUNK_SUFFIX = '.pdf'
+
+
+class MgmtSystemStandardReportJob(models.Model):
+    """Standard Control Report Export Job
+
+    Renders the control report of many controls in the background. The
+    controls are split in chunks that are rendered concurrently, each chunk
+    by its own wkhtmltopdf process driven from a worker thread with its own
+    cursor. Every rendered chunk is stored as an attachment of the job, so
+    a job resumes where it stopped; once all of them are there, they are
+    merged in order and the merged file is attached to the standard.
+
+    Jobs are processed by a cron that is triggered when a job is queued and
+    renders a bounded number of chunks per run, re-queuing the job until
+    it is complete. Jobs left running by a killed worker are re-queued once
+    they are older than the cron time limit.
+    """
+    _name = 'mgmtsystem.standard.report.job'
+    _description = 'Standard Control Report Export Job'
+    _order = 'create_date desc, id desc'
+
+    name = fields.Char(string='Name', required=True)
+    standard_id = fields.Many2one(
+        'mgmtsystem.standard',
+        string='Standard',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    control_ids = fields.Many2many(
+        'mgmtsystem.standard.control',
+        'mgmtsystem_standard_report_job_control_rel',
+        'job_id',
+        'control_id',
+        string='Controls',
+    )
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='queued', required=True, index=True)
+    chunk_size = fields.Integer(string='Chunk Size', default=REPORT_JOB_CHUNK_SIZE)
+    chunk_count = fields.Integer(string='Chunks', readonly=True)
+    chunks_done = fields.Integer(string='Chunks Done', readonly=True)
+    progress = fields.Float(
+        string='Progress',
+        compute='_compute_progress',
+        help="Percentage of the chunks rendered"
+    )
+    attachment_id = fields.Many2one('ir.attachment', string='Report', readonly=True)
+    date_started = fields.Datetime(string='Started', readonly=True)
+    date_finished = fields.Datetime(string='Finished', readonly=True)
+    error_message = fields.Text(string='Error', readonly=True)
+
+    @api.depends('chunks_done', 'chunk_count')
+    def _compute_progress(self):
+        for job in self:
+            job.progress = 100.0 * job.chunks_done / job.chunk_count if job.chunk_count else 0.0
+
+    @api.model
+    def _queue_jobs(self, controls):
+        """Queue one export job per standard of ``controls``"""
+        if not controls:
+            raise UserError(_('There are no controls to export.'))
+        vals_list = []
+        for standard in controls.standard_id:
+            vals_list.append({
+                'name': _('%(standard)s - Controls', standard=standard.display_name),
+                'standard_id': standard.id,
+                'control_ids': [(6, 0, controls.filtered(lambda c: c.standard_id == standard).ids)],
+            })
+        jobs = self.create(vals_list)
+        self.env.ref('mgmtsystem_standards.ir_cron_process_report_jobs')._trigger()
+        return jobs
+
+    def _get_chunks(self):
+        self.ensure_one()
+        chunk_size = self.chunk_size or REPORT_JOB_CHUNK_SIZE
+        control_ids = self.control_ids.ids
+        return [control_ids[start:start + chunk_size] for start in range(0, len(control_ids), chunk_size)]
+
+    def _get_worker_count(self):
+        value = self.env['ir.config_parameter'].sudo().get_param('mgmtsystem_standards.report_job_workers')
+        return max(min(int(value or REPORT_JOB_WORKERS), config['db_maxconn'] - 1), 1)
+
+    def _get_chunk_attachments(self):
+        """Rendered chunks of the job, by chunk index"""
+        self.ensure_one()
+        attachments = self.env['ir.attachment'].search([
+            ('res_model', '=', self._name),
+            ('res_id', '=', self.id),
+            ('name', '=like', f'{REPORT_JOB_CHUNK_PREFIX}%{REPORT_JOB_CHUNK_SUFFIX}'),
+        ])
+        return {
+            int(attachment.name.removeprefix(REPORT_JOB_CHUNK_PREFIX).removesuffix(REPORT_JOB_CHUNK_SUFFIX)): attachment
+            for attachment in attachments
+        }
+
+    def _render_chunk(self, control_ids, uid, context):
+        """Render the report of ``control_ids`` as ``uid`` on a dedicated cursor
+
+        Runs in a worker thread, so it must not touch the job's cursor.
+        """
+        with self.env.registry.cursor() as cr:
+            env = api.Environment(cr, uid, context)
+            pdf_content, __ = env['ir.actions.report']._render_qweb_pdf(REPORT_JOB_REPORT, res_ids=control_ids)
+            return pdf_content
+
+    def _run(self, max_chunks=REPORT_JOB_CHUNKS_PER_RUN):
+        """Render up to ``max_chunks`` missing chunks, then merge and attach the report
+
+        :return: True when the job is done, False when chunks are left for
+                 a next run
+        """
+        self.ensure_one()
+        chunks = self._get_chunks()
+        done = self._get_chunk_attachments()
+        todo = [index for index in range(len(chunks)) if index not in done][:max_chunks]
+        self.write({
+            'state': 'running',
+            'chunk_count': len(chunks),
+            'chunks_done': len(done),
+            'date_started': fields.Datetime.now(),
+            'error_message': False,
+        })
+        # Make the job's status and progress visible while it runs
+        self.env.cr.commit()
+
+        if todo:
+            context = dict(self.env.context)
+            with ThreadPoolExecutor(max_workers=min(self._get_worker_count(), len(todo))) as executor:
+                futures = {
+                    executor.submit(self._render_chunk, chunks[index], self.create_uid.id, context): index
+                    for index in todo
+                }
+                for future in as_completed(futures):
+                    index = futures[future]
+                    done[index] = self.env['ir.attachment'].create({
+                        'name': f'{REPORT_JOB_CHUNK_PREFIX}{index:05d}{REPORT_JOB_CHUNK_SUFFIX}',
+                        'type': 'binary',
+                        'datas': base64.b64encode(future.result()),
+                        'res_model': self._name,
+                        'res_id': self.id,
+                        'mimetype': 'application/pdf',
+                    })
+                    self.chunks_done = len(done)
+                    self.env.cr.commit()
+        if len(done) < len(chunks):
+            self.state = 'queued'
+            return False
+
+        pdfs = [base64.b64decode(done[index].datas) for index in range(len(chunks))]
+        attachment = self.env['ir.attachment'].create({
+            'name': f'{self.name}.pdf',
+            'type': 'binary',
+            'datas': base64.b64encode(merge_pdf(pdfs) if len(pdfs) > 1 else pdfs[0]),
+            'res_model': 'mgmtsystem.standard',
+            'res_id': self.standard_id.id,
+            'mimetype': 'application/pdf',
+        })
+        self.env['ir.attachment'].concat(*done.values()).unlink()
+        self.write({
+            'state': 'done',
+            'attachment_id': attachment.id,
+            'date_finished': fields.Datetime.now(),
+        })
+        self.standard_id.message_post(
+            body=_('Control report exported (%(count)s controls).', count=len(self.control_ids)),
+            attachment_ids=attachment.ids,
+            partner_ids=self.create_uid.partner_id.ids,
+        )
+        return True
+
+    @api.model
+    def _get_stale_timeout(self):
+        """Seconds after which a running job was necessarily killed with its cron worker"""
+        limit = config['limit_time_real_cron']
+        if limit is None or limit < 0:
+            limit = config['limit_time_real']
+        return limit or REPORT_JOB_STALE_TIMEOUT
+
+    @api.model
+    def _requeue_stale_jobs(self):
+        """Re-queue the running jobs whose cron worker died; their chunks are kept"""
+        stale_jobs = self.search([
+            ('state', '=', 'running'),
+            ('date_started', '<', fields.Datetime.now() - timedelta(seconds=self._get_stale_timeout())),
+        ])
+        if stale_jobs:
+            _logger.warning("Re-queuing stale control report export jobs %s", stale_jobs.ids)
+            stale_jobs.write({'state': 'queued'})
+        return stale_jobs
+
+    @api.model
+    def _cron_process_report_jobs(self):
+        """Advance the oldest queued job, then re-trigger until none is left"""
+        self._requeue_stale_jobs()
+        job = self.search([('state', '=', 'queued')], order='id', limit=1)
+        if not job:
+            return
+        try:
+            job._run()
+        except Exception as e:
+            self.env.cr.rollback()
+            _logger.exception("Control report export job %s failed", job.id)
+            job.write({
+                'state': 'failed',
+                'error_message': str(e),
+                'date_finished': fields.Datetime.now(),
+            })
+        self.env['ir.cron']._notify_progress(done=1, remaining=self.search_count([('state', '=', 'queued')]))
+
+    def action_retry(self):
+        self.filtered(lambda job: job.state == 'failed').write({'state': 'queued'})
+        self.env.ref('mgmtsystem_standards.ir_cron_process_report_jobs')._trigger()
+
+    def action_download(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/web/content/{self.attachment_id.id}?download=true',
+            'target': 'self',
+        }
@@ -12,7 +12,7 @@ class MgmtSystemStandardRequirement(models.Model):
     """
     _name = "mgmtsystem.standard.requirement"
     _description = "Management System Standard Requirement"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'mgmtsystem.company.propagation.mixin']
     _order = "sequence, standard_id, code, name"
     _parent_name = "parent_id"
     _parent_store = True
@@ -158,21 +158,7 @@ class MgmtSystemStandardRequirement(models.Model):
             else:
                 requirement.complete_code = requirement.code
 
-    @api.model_create_multi
-    def create(self, vals_list):
-        """Ensure company_id is always included in allowed_company_ids"""
-        records = super().create(vals_list)
-        for record in records:
-            if record.company_id and record.company_id not in record.allowed_company_ids:
-                record.allowed_company_ids = [(4, record.company_id.id)]
-        return records
-    
-    def write(self, vals):
-        """Ensure company_id is always included in allowed_company_ids when updated"""
-        result = super().write(vals)
-        # Check if either company_id or allowed_company_ids was modified
-        if 'company_id' in vals or 'allowed_company_ids' in vals:
-            for record in self:
-                if record.company_id and record.company_id not in record.allowed_company_ids:
-                    record.allowed_company_ids = [(4, record.company_id.id)]
-        return result
+    @api.model
+    def _get_company_propagation_trigger_fields(self):
+        # The company is related to the standard
+        return super()._get_company_propagation_trigger_fields() | {'standard_id'}
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, api
+
+# Control fields printed by the standard control report
+REPORT_CONTROL_FIELDS = [
+    'name', 'reference', 'code', 'description', 'standard_id', 'domain_id',
+    'company_id', 'control_owner_id', 'state', 'control_type', 'priority',
+    'is_required', 'effectiveness_score', 'last_assessment_date',
+    'implementation_time', 'implementation_cost', 'maintenance_time',
+    'maintenance_cost', 'test_frequency', 'last_test_date', 'next_test_date',
+    'test_procedure', 'test_count', 'action_count', 'approval_date',
+    'implementation_date', 'verification_date', 'retirement_date',
+    'approver_id', 'verifier_id', 'automated_assessment', 'assessment_tools',
+    'last_automated_check', 'automated_check_result', 'additional_information',
+    'implementation_details',
+]
+
+
+class ReportStandardControl(models.AbstractModel):
+    """Standard Control Report Data Provider
+
+    Reads the printed values of all the controls in bulk and hands plain
+    dictionaries to the template: one read for the controls' own and
+    computed fields, one name lookup per related model and one for the
+    assessment tools, whatever the number of controls.
+    """
+    _name = 'report.mgmtsystem_standards.report_standard_control'
+    _description = 'Standard Control Report'
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        docs = self.env['mgmtsystem.standard.control'].browse(docids)
+        return {
+            'doc_ids': docids,
+            'doc_model': docs._name,
+            'docs': docs,
+            'controls': self._get_control_values(docs),
+        }
+
+    @api.model
+    def _get_control_values(self, controls):
+        """Printable values of ``controls``, in the order of the recordset
+
+        Many2one fields hold the display name of the related record,
+        selection fields their label and ``assessment_tools`` the
+        comma-separated tool names.
+        """
+        rows = controls.read(REPORT_CONTROL_FIELDS)
+        tool_ids = {tool_id for row in rows for tool_id in row['assessment_tools']}
+        tools = self.env['mgmtsystem.standard.control.assessment.tool'].browse(tool_ids)
+        tool_names = {tool['id']: tool['name'] for tool in tools.read(['name'])}
+        selections = {
+            fname: dict(field._description_selection(self.env))
+            for fname, field in controls._fields.items()
+            if fname in REPORT_CONTROL_FIELDS and field.type == 'selection'
+        }
+
+        for row in rows:
+            for fname, value in row.items():
+                field = controls._fields.get(fname)
+                if field is None:
+                    continue
+                if field.type == 'many2one':
+                    row[fname] = value[1] if value else False
+                elif field.type == 'selection':
+                    row[fname] = selections[fname].get(value, value)
+            row['assessment_tools'] = ', '.join(tool_names[tool_id] for tool_id in row['assessment_tools'])
+        return rows
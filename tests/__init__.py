@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+
+from . import test_control_cost_rollup
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestControlCostRollup(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.standard = cls.env['mgmtsystem.standard'].create({
+            'name': 'Rollup Standard',
+            'title': 'Rollup Standard',
+        })
+
+    def _create_sibling_controls(self, count):
+        domain = self.env['mgmtsystem.standard.domain'].create({
+            'name': f'Domain {count}',
+            'title': f'Domain {count}',
+            'standard_id': self.standard.id,
+        })
+        return self.env['mgmtsystem.standard.control'].create([{
+            'name': f'Control {count}.{index}',
+            'standard_id': self.standard.id,
+            'domain_id': domain.id,
+            'maintenance_time': 30.0,
+            'test_frequency': 'quarterly',
+        } for index in range(count)])
+
+    def _read_rollups(self, controls):
+        controls.mapped('domain_total_maintenance_cost_manual')
+        controls.mapped('standard_total_maintenance_cost_combined')
+
+    def test_sibling_rollup_query_count_is_constant(self):
+        """Reading the sibling totals costs the same for 1, 10 or 100 controls"""
+        # Warm up the registry caches (record rules, field metadata)
+        self._read_rollups(self._create_sibling_controls(2))
+        for count in (1, 10, 100):
+            controls = self._create_sibling_controls(count)
+            self.env.flush_all()
+            self.env.invalidate_all()
+            # One read of the controls, one grouped query per rollup level
+            with self.assertQueryCount(3):
+                self._read_rollups(controls)
+
+    def test_sibling_rollup_totals(self):
+        controls = self._create_sibling_controls(10)
+        expected = sum(controls.mapped('maintenance_cost'))
+        self.assertAlmostEqual(controls[0].domain_total_maintenance_cost_manual, expected)
+        controls[0].maintenance_time = 60.0
+        self.assertAlmostEqual(
+            controls[-1].domain_total_maintenance_cost_manual,
+            sum(controls.mapped('maintenance_cost')),
+        )
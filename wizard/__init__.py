@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import mgmtsystem_standard_catalog_import_wizard
+from . import mgmtsystem_standard_certification_import_wizard
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import io
+
+from odoo import models, fields, _
+from odoo.exceptions import UserError
+
+from ..models.mgmtsystem_standard_catalog_importer import CATALOG_IMPORT_BATCH_SIZE
+
+
+class StandardCatalogImportWizard(models.TransientModel):
+    """Upload a CSV or JSON Lines catalog and run the catalog importer on it"""
+    _name = 'mgmtsystem.standard.catalog.import.wizard'
+    _description = 'Standard Catalog Import Wizard'
+
+    catalog_file = fields.Binary(
+        string='Catalog File',
+        required=True,
+        help="CSV or JSON Lines file with one standard, domain, requirement or control per row"
+    )
+    filename = fields.Char(string='Filename')
+    mode = fields.Selection([
+        ('import', 'Import New Records'),
+        ('upgrade', 'Upgrade Standard'),
+    ], string='Mode', required=True, default='import',
+        help="Upgrade diffs the catalog against the standard: changed records are updated "
+             "and records missing from the catalog are archived")
+    file_format = fields.Selection([
+        ('csv', 'CSV'),
+        ('jsonl', 'JSON Lines'),
+    ], string='Format', required=True, default='csv')
+    standard_id = fields.Many2one(
+        'mgmtsystem.standard',
+        string='Standard',
+        help="Standard the rows are imported into, unless the catalog starts with a standard row"
+    )
+    batch_size = fields.Integer(
+        string='Batch Size',
+        default=CATALOG_IMPORT_BATCH_SIZE,
+        help="Number of rows created per batch"
+    )
+
+    def action_import(self):
+        self.ensure_one()
+        importer = self.env['mgmtsystem.standard.catalog.importer']
+        stream = io.BytesIO(base64.b64decode(self.catalog_file))
+        batch_size = self.batch_size or CATALOG_IMPORT_BATCH_SIZE
+        if self.mode == 'upgrade':
+            if not self.standard_id:
+                raise UserError(_('Select the standard to upgrade.'))
+            result = importer.upgrade_catalog_file(stream, self.file_format, self.standard_id, batch_size=batch_size)
+            title = _('Catalog upgraded')
+            message = _(
+                '%(rows)s rows in %(duration).1fs (%(speed).0f rows/s). Created: %(created)s. '
+                'Updated: %(updated)s. Archived: %(archived)s. Superseded: %(superseded)s.',
+                rows=result['rows'],
+                duration=result['duration'],
+                speed=result['rows_per_second'],
+                created=self._format_counts(result['created']),
+                updated=self._format_counts(result['updated']),
+                archived=self._format_counts(result['archived']),
+                superseded=result['superseded'],
+            )
+        else:
+            result = importer.import_catalog_file(stream, self.file_format, standard=self.standard_id, batch_size=batch_size)
+            title = _('Catalog imported')
+            message = _(
+                '%(rows)s rows in %(duration).1fs (%(speed).0f rows/s). Created: %(created)s. Skipped: %(skipped)s.',
+                rows=result['rows'],
+                duration=result['duration'],
+                speed=result['rows_per_second'],
+                created=self._format_counts(result['created']),
+                skipped=result['skipped'],
+            )
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': title,
+                'message': message,
+                'type': 'success',
+                'sticky': True,
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
+
+    def _format_counts(self, counts):
+        return ', '.join(f'{count} {row_type}' for row_type, count in counts.items()) or _('nothing')
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import io
+
+from odoo import models, fields, _
+
+from ..models.mgmtsystem_standard_certification_importer import CIS_IMPORT_BATCH_SIZE
+
+
+class StandardCertificationImportWizard(models.TransientModel):
+    """Upload a CIS benchmark workbook and import it as certifications"""
+    _name = 'mgmtsystem.standard.certification.import.wizard'
+    _description = 'CIS Benchmark Import Wizard'
+
+    workbook_file = fields.Binary(
+        string='Benchmark Workbook',
+        required=True,
+        help="CIS benchmark Excel (.xlsx) file"
+    )
+    filename = fields.Char(string='Filename')
+    standard_id = fields.Many2one(
+        'mgmtsystem.standard',
+        string='Standard',
+        required=True,
+        help="Standard the certifications are imported into"
+    )
+    batch_size = fields.Integer(
+        string='Batch Size',
+        default=CIS_IMPORT_BATCH_SIZE,
+        help="Number of certifications created or updated per batch"
+    )
+
+    def action_import(self):
+        self.ensure_one()
+        result = self.env['mgmtsystem.standard.certification.importer'].import_cis_workbook(
+            io.BytesIO(base64.b64decode(self.workbook_file)),
+            self.standard_id,
+            batch_size=self.batch_size or CIS_IMPORT_BATCH_SIZE,
+        )
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('CIS benchmark imported'),
+                'message': _(
+                    '%(rows)s rows in %(duration).1fs (%(speed).0f rows/s). Created: %(created)s. Updated: %(updated)s.',
+                    rows=result['rows'],
+                    duration=result['duration'],
+                    speed=result['rows_per_second'],
+                    created=result['created'],
+                    updated=result['updated'],
+                ),
+                'type': 'success',
+                'sticky': True,
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }